@@ -5,10 +5,18 @@ Provides REST API endpoints for the fishing information portal
 """
 
 import os
+import functools
 import json
+import queue
 import sqlite3
 import sys
-from flask import Flask, jsonify, request
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import orjson
+from flask import Flask, request
 from flask_cors import CORS
 
 # Add scripts directory to Python path for working_database import
@@ -22,196 +30,321 @@ WEATHER_DB = "sqlite_db/weather_data.db"
 STOCKING_DB = "sqlite_db/stocking_data.db"
 WATER_TEMP_DB = "sqlite_db/water_temperature.db"
 
-def cleanup_old_weather_data():
-    """Clean up weather data older than 30 days"""
+# Columns returned by the API endpoints (ids are internal and not exposed)
+WEATHER_COLS = ('location', 'date_ts', 'date_str', 'sunrise', 'summary', 'temp_day',
+                'pressure', 'wind_speed', 'wind_gust', 'fishing_base', 'fishing_rating',
+                'created_at')
+STOCKING_COLS = ('lake_name', 'species', 'stocking_date', 'fish_size', 'quantity',
+                 'latitude', 'longitude', 'notes', 'source')
+WATER_TEMP_COLS = ('lake_name', 'temperature_celsius', 'temperature_fahrenheit', 'timestamp',
+                   'source', 'latitude', 'longitude', 'depth', 'notes')
+
+# Query strings are fixed so sqlite3's per-connection statement cache is reused
+WEATHER_SQL = f"SELECT {', '.join(WEATHER_COLS)} FROM weather_data ORDER BY created_at DESC LIMIT 50"
+_EIGHT_DAYS = 8 * 86400  # Forecast window, in seconds
+FORECAST_SQL = (f"SELECT {', '.join(WEATHER_COLS)} FROM weather_data "
+                "WHERE date_ts >= ? ORDER BY date_ts DESC LIMIT 50")
+STOCKING_SQL = f"SELECT {', '.join(STOCKING_COLS)} FROM stocking_records LIMIT 50"
+WATER_TEMP_SQL = (f"SELECT {', '.join(WATER_TEMP_COLS)} FROM water_temperature_records "
+                  "ORDER BY timestamp DESC LIMIT 50")
+LATEST_WATER_TEMP_SQL = f"""
+    SELECT {', '.join(WATER_TEMP_COLS)}
+    FROM water_temperature_records
+    WHERE id IN (
+        SELECT MAX(id)
+        FROM water_temperature_records
+        GROUP BY lake_name
+    )
+    ORDER BY lake_name
+"""
+
+# Fishing locations served by /api/locations
+LOCATIONS = [
+    {"name": "Winnipesaukee", "lat": "43.6406", "lon": "-72.1440"},
+    {"name": "Newfound", "lat": "43.7528", "lon": "-71.7999"},
+    {"name": "Squam", "lat": "43.8280", "lon": "-71.5503"},
+    {"name": "Champlain", "lat": "44.4896", "lon": "-73.3582"},
+    {"name": "Mascoma", "lat": "43.6587", "lon": "-72.3200"},
+    {"name": "Sunapee", "lat": "43.3770", "lon": "-72.0850"},
+    {"name": "First Connecticut", "lat": "45.0926", "lon": "-71.2478"}
+]
+_LOCATIONS_JSON = orjson.dumps(LOCATIONS)
+
+# Per-lake fields returned by /api/water-temperature/latest, in SELECT order
+_WT_KEYS = WATER_TEMP_COLS[1:]
+
+# Read connections kept open per database file
+POOL_SIZE = 4
+
+class ConnectionPool:
+    """Fixed-size pool of pre-opened, read-only SQLite connections"""
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._open())
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA query_only=1")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def release(self, conn: sqlite3.Connection):
+        self._connections.put(conn)
+
+def _orjson_default(obj):
+    """Serialize sqlite3.Row objects as plain mappings"""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def ojsonify(obj):
+    """Build a JSON response using orjson instead of Flask's stdlib encoder"""
+    return app.response_class(orjson.dumps(obj, default=_orjson_default,
+                                           option=orjson.OPT_NON_STR_KEYS),
+                              mimetype='application/json')
+
+# Seconds a cached API response body stays fresh
+API_CACHE_TTL = 60
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def cached_json_response(view):
+    """Serve a view's encoded JSON body from an in-process TTL cache keyed by path"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.path
+        now = time.monotonic()
+        with _response_cache_lock:
+            entry = _response_cache.get(key)
+        if entry is None or now - entry[0] >= API_CACHE_TTL:
+            result = view(*args, **kwargs)
+            if isinstance(result, tuple):
+                # (body, status) error responses are never cached
+                return result
+            entry = (now, result.get_data())
+            with _response_cache_lock:
+                _response_cache[key] = entry
+        
+        response = app.response_class(entry[1], mimetype='application/json')
+        max_age = max(0, int(API_CACHE_TTL - (now - entry[0])))
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        return response
+    return wrapper
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+@contextmanager
+def get_conn(db_path: str):
+    """Borrow a pooled connection for db_path, returning it when done"""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = _pools[db_path] = ConnectionPool(db_path)
+    conn = pool.acquire()
     try:
-        from working_database import WorkingWeatherDatabase
-        db = WorkingWeatherDatabase()
-        deleted_count = db.cleanup_old_data(days_to_keep=30)
-        if deleted_count > 0:
-            print(f"Cleaned up {deleted_count} old weather records")
-        return deleted_count
+        yield conn
+    finally:
+        pool.release(conn)
+
+_weather_db = None
+_weather_db_lock = threading.Lock()
+
+def get_weather_db():
+    """Return the process-wide WorkingWeatherDatabase, opening it on first use"""
+    global _weather_db
+    if _weather_db is None:
+        with _weather_db_lock:
+            if _weather_db is None:
+                from working_database import WorkingWeatherDatabase
+                _weather_db = WorkingWeatherDatabase(WEATHER_DB)
+    return _weather_db
+
+def cleanup_old_weather_data(days_to_keep: int = 30) -> int:
+    """Clean up weather data older than days_to_keep days (raises sqlite3.Error on failure)"""
+    deleted_count = get_weather_db().cleanup_old_data(days_to_keep=days_to_keep)
+    if deleted_count > 0:
+        print(f"Cleaned up {deleted_count} old weather records")
+    return deleted_count
+
+def _startup_cleanup():
+    """Run the startup cleanup, reporting rather than raising a failure"""
+    try:
+        cleanup_old_weather_data()
     except Exception as e:
         print(f"Error during cleanup: {e}")
-        return 0
 
-# Run cleanup on startup
-cleanup_old_weather_data()
+# Cleanup jobs run one at a time, off the request path. Their status lives in
+# the weather db so any worker process can report on a job another one queued
+MAX_TRACKED_CLEANUP_JOBS = 20
+_cleanup_executor = ThreadPoolExecutor(max_workers=1)
+
+def _run_cleanup_job(job_id: str, days_to_keep: int):
+    """Run a queued cleanup and record its outcome"""
+    weather_db = get_weather_db()
+    weather_db.update_cleanup_job(job_id, 'running')
+    try:
+        deleted_count = cleanup_old_weather_data(days_to_keep)
+    except Exception as e:
+        weather_db.update_cleanup_job(job_id, 'failed', error=str(e))
+        return
+    weather_db.update_cleanup_job(job_id, 'completed', deleted_count)
+
+def submit_cleanup_job(days_to_keep: int):
+    """Queue a cleanup run and return its tracking record (None if it could not be recorded)"""
+    job = get_weather_db().add_cleanup_job(uuid.uuid4().hex, days_to_keep,
+                                           keep=MAX_TRACKED_CLEANUP_JOBS)
+    if job is not None:
+        _cleanup_executor.submit(_run_cleanup_job, job['job_id'], days_to_keep)
+    return job
+
+# Startup cleanup runs once per serving process, kicked off by its first request
+# so the auto-reloader's monitor process (which never serves) does not run it
+_startup_cleanup_started = False
+_startup_cleanup_lock = threading.Lock()
+
+@app.before_request
+def _start_startup_cleanup():
+    """Run cleanup in the background on the first request, without blocking it"""
+    global _startup_cleanup_started
+    if _startup_cleanup_started:
+        return
+    with _startup_cleanup_lock:
+        if _startup_cleanup_started:
+            return
+        _startup_cleanup_started = True
+    threading.Thread(target=_startup_cleanup, daemon=True).start()
 
 @app.route('/api/weather')
+@cached_json_response
 def get_weather():
     """Get weather data for all locations"""
     try:
-        conn = sqlite3.connect(WEATHER_DB)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM weather_data ORDER BY created_at DESC LIMIT 50")
-        rows = cursor.fetchall()
-        
-        # Get column names
-        columns = [description[0] for description in cursor.description]
-        
-        # Convert to list of dictionaries
-        weather_data = []
-        for row in rows:
-            weather_data.append(dict(zip(columns, row)))
+        with get_conn(WEATHER_DB) as conn:
+            weather_data = conn.execute(WEATHER_SQL).fetchall()
         
-        conn.close()
-        return jsonify(weather_data)
+        return ojsonify(weather_data)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/stocking')
 def get_stocking():
     """Get stocking data"""
     try:
-        conn = sqlite3.connect(STOCKING_DB)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM stocking_records LIMIT 50")
-        rows = cursor.fetchall()
+        with get_conn(STOCKING_DB) as conn:
+            stocking_data = conn.execute(STOCKING_SQL).fetchall()
         
-        columns = [description[0] for description in cursor.description]
-        stocking_data = []
-        for row in rows:
-            stocking_data.append(dict(zip(columns, row)))
-        
-        conn.close()
-        return jsonify(stocking_data)
+        return ojsonify(stocking_data)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/water-temperature')
 def get_water_temperature():
     """Get water temperature data"""
     try:
-        conn = sqlite3.connect(WATER_TEMP_DB)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM water_temperature_records ORDER BY timestamp DESC LIMIT 50")
-        rows = cursor.fetchall()
-        
-        columns = [description[0] for description in cursor.description]
-        water_temp_data = []
-        for row in rows:
-            water_temp_data.append(dict(zip(columns, row)))
+        with get_conn(WATER_TEMP_DB) as conn:
+            water_temp_data = conn.execute(WATER_TEMP_SQL).fetchall()
         
-        conn.close()
-        return jsonify(water_temp_data)
+        return ojsonify(water_temp_data)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/water-temperature/latest')
+@cached_json_response
 def get_latest_water_temperature():
     """Get latest water temperature data for each lake"""
     try:
-        conn = sqlite3.connect(WATER_TEMP_DB)
-        cursor = conn.cursor()
-        
-        # Get the latest temperature for each lake
-        cursor.execute("""
-            SELECT lake_name, temperature_celsius, temperature_fahrenheit, 
-                   timestamp, source, latitude, longitude, depth, notes
-            FROM water_temperature_records w1
-            WHERE timestamp = (
-                SELECT MAX(timestamp) 
-                FROM water_temperature_records w2 
-                WHERE w2.lake_name = w1.lake_name
-            )
-            ORDER BY lake_name
-        """)
-        
-        rows = cursor.fetchall()
+        with get_conn(WATER_TEMP_DB) as conn:
+            # Get the latest temperature for each lake
+            rows = conn.execute(LATEST_WATER_TEMP_SQL).fetchall()
         
         # Convert to dictionary format expected by frontend
-        latest_data = {}
-        for row in rows:
-            lake_name = row[0]
-            latest_data[lake_name] = {
-                'temperature_celsius': row[1],
-                'temperature_fahrenheit': row[2],
-                'timestamp': row[3],
-                'source': row[4],
-                'latitude': row[5],
-                'longitude': row[6],
-                'depth': row[7],
-                'notes': row[8]
-            }
+        dict_, zip_ = dict, zip
+        latest_data = {row[0]: dict_(zip_(_WT_KEYS, row[1:])) for row in rows}
         
-        conn.close()
-        return jsonify(latest_data)
+        return ojsonify(latest_data)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/forecast')
+@cached_json_response
 def get_forecast():
     """Get weather forecast data"""
     try:
-        conn = sqlite3.connect(WEATHER_DB)
-        cursor = conn.cursor()
         # Use date_ts (timestamp) instead of non-existent date column
-        # Get current timestamp and data from last 8 days (forecast period)
-        import time
-        current_timestamp = int(time.time())
-        eight_days_ago = current_timestamp - (8 * 24 * 60 * 60)  # 8 days ago
+        # Get data from last 8 days (forecast period)
+        eight_days_ago = int(time.time()) - _EIGHT_DAYS
         
-        cursor.execute("SELECT * FROM weather_data WHERE date_ts >= ? ORDER BY date_ts DESC LIMIT 50", (eight_days_ago,))
-        rows = cursor.fetchall()
+        with get_conn(WEATHER_DB) as conn:
+            forecast_data = conn.execute(FORECAST_SQL, (eight_days_ago,)).fetchall()
         
-        columns = [description[0] for description in cursor.description]
-        forecast_data = []
-        for row in rows:
-            forecast_data.append(dict(zip(columns, row)))
-        
-        conn.close()
-        return jsonify(forecast_data)
+        return ojsonify(forecast_data)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/locations')
 def get_locations():
     """Get available fishing locations"""
-    locations = [
-        {"name": "Winnipesaukee", "lat": "43.6406", "lon": "-72.1440"},
-        {"name": "Newfound", "lat": "43.7528", "lon": "-71.7999"},
-        {"name": "Squam", "lat": "43.8280", "lon": "-71.5503"},
-        {"name": "Champlain", "lat": "44.4896", "lon": "-73.3582"},
-        {"name": "Mascoma", "lat": "43.6587", "lon": "-72.3200"},
-        {"name": "Sunapee", "lat": "43.3770", "lon": "-72.0850"},
-        {"name": "First Connecticut", "lat": "45.0926", "lon": "-71.2478"}
-    ]
-    return jsonify(locations)
+    response = app.response_class(_LOCATIONS_JSON, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
 
 @app.route('/api/cleanup', methods=['POST'])
 def trigger_cleanup():
     """Manually trigger cleanup of old weather data"""
     try:
-        days_to_keep = request.json.get('days_to_keep', 30) if request.json else 30
-        deleted_count = cleanup_old_weather_data()
+        body = request.get_json(silent=True)
+        days_to_keep = body.get('days_to_keep', 30) if isinstance(body, dict) else 30
+        # bool is an int subclass, but true/false is not a day count
+        if (not isinstance(days_to_keep, int) or isinstance(days_to_keep, bool)
+                or days_to_keep < 1):
+            return ojsonify({"error": "days_to_keep must be an integer of at least 1"}), 400
         
-        # Get cleanup statistics
-        from working_database import WorkingWeatherDatabase
-        db = WorkingWeatherDatabase()
-        cleanup_stats = db.get_cleanup_statistics()
+        job = submit_cleanup_job(days_to_keep)
+        if job is None:
+            return ojsonify({"error": "Could not queue cleanup job"}), 500
         
-        return jsonify({
+        return ojsonify({
             "success": True,
-            "deleted_records": deleted_count,
-            "cleanup_stats": cleanup_stats,
-            "message": f"Cleanup completed. Kept data from last {days_to_keep} days."
-        })
+            "job": job,
+            "status_url": f"/api/cleanup/stats?job_id={job['job_id']}",
+            "message": f"Cleanup queued. Data from the last {days_to_keep} days will be kept."
+        }), 202
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/api/cleanup/stats')
 def get_cleanup_stats():
-    """Get cleanup statistics"""
+    """Get cleanup statistics, plus the status of a cleanup job if job_id is given"""
     try:
-        from working_database import WorkingWeatherDatabase
-        db = WorkingWeatherDatabase()
-        cleanup_stats = db.get_cleanup_statistics()
-        return jsonify(cleanup_stats)
+        cleanup_stats = get_weather_db().get_cleanup_statistics()
+        
+        job_id = request.args.get('job_id')
+        if job_id:
+            job = get_weather_db().get_cleanup_job(job_id)
+            if job is None:
+                return ojsonify({"error": f"Unknown cleanup job {job_id}"}), 404
+            cleanup_stats['job'] = job
+        
+        return ojsonify(cleanup_stats)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
+
+from flask import send_file, send_from_directory
 
-from flask import send_file
+# Browser cache lifetime for JS/CSS served by Flask (Apache serves them in production)
+STATIC_MAX_AGE = 3600
 
 @app.route('/')
 def index():
@@ -251,12 +384,14 @@ def guide():
 @app.route('/js/<path:filename>')
 def serve_js(filename):
     """Serve JavaScript files"""
-    return send_file(f'js/{filename}')
+    return send_from_directory(os.path.join(app.root_path, 'js'), filename,
+                               max_age=STATIC_MAX_AGE)
 
 @app.route('/css/<path:filename>')
 def serve_css(filename):
     """Serve CSS files"""
-    return send_file(f'css/{filename}')
+    return send_from_directory(os.path.join(app.root_path, 'css'), filename,
+                               max_age=STATIC_MAX_AGE)
 
 @app.route('/debug_weather.html')
 def debug_weather():
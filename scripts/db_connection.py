@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Connection Setup
+Opens and closes the tuned connections the weather and stocking databases share
+"""
+
+import sqlite3
+from typing import Optional
+
+# Seconds a statement waits on a locked database before raising
+BUSY_TIMEOUT = 10.0
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection with the per-connection tuning PRAGMAs applied"""
+    # timeout is SQLite's busy handler: a write that finds the database
+    # locked (SQLITE_BUSY) retries with backoff for up to that long
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                           cached_statements=256)
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL: no fsync per commit
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped reads
+    return conn
+
+def close(conn: sqlite3.Connection):
+    """Refresh planner statistics for the indexes conn used, then close it"""
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+def require_open(conn: Optional[sqlite3.Connection]) -> sqlite3.Connection:
+    """Return conn, or raise the error sqlite3 gives for a closed connection"""
+    if conn is None:
+        raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+    return conn
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Session
+Pooled keep-alive sessions with one retry policy for the data fetchers
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Retry transient HTTP failures with exponential backoff, honouring Retry-After
+HTTP_RETRY = Retry(total=3, backoff_factor=1, status_forcelist=(429, 502, 503, 504),
+                   respect_retry_after_header=True, raise_on_status=False)
+
+def make_session(pool_connections: int = 10, pool_maxsize: int = 20) -> requests.Session:
+    """Build a session whose HTTPS calls reuse pooled connections and retry with HTTP_RETRY"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize,
+                                          max_retries=HTTP_RETRY))
+    return session
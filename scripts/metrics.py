@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Progress Point Timing
+Lightweight wall-clock timings around the hot update and insert paths
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class Timing:
+    """Running count, total and worst case for one progress point"""
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+METRICS: Dict[str, Timing] = {}
+_metrics_lock = threading.Lock()
+
+@contextmanager
+def progress_point(name: str):
+    """Time the enclosed block and record it under name in METRICS"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _metrics_lock:
+            timing = METRICS.get(name)
+            if timing is None:
+                timing = METRICS[name] = Timing()
+            timing.add(elapsed)
+
+def metrics_snapshot() -> Dict[str, Dict[str, float]]:
+    """Summarise METRICS as plain dicts (seconds)"""
+    with _metrics_lock:
+        return {
+            name: {
+                'count': timing.count,
+                'total_s': timing.total,
+                'mean_s': timing.total / timing.count,
+                'max_s': timing.max
+            }
+            for name, timing in METRICS.items()
+        }
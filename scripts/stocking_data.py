@@ -4,17 +4,97 @@ NH Fish & Game Stocking Data Module
 Handles stocking report data from NH Fish & Game and provides automatic updates
 """
 
+import atexit
 import os
 import json
 import datetime
 import logging
-import requests
+import orjson
 import sqlite3
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
+import db_connection
+from http_session import make_session
+from metrics import progress_point
 
 logger = logging.getLogger("stocking_data")
 
+# ArcGIS query formats to try against each service, most preferred first
+ARCGIS_QUERY_SUFFIXES = (
+    "/query?where=1%3D1&outFields=*&f=json",
+    "/query?where=1%3D1&outFields=*&returnGeometry=true&f=json",
+    "?f=json",
+)
+
+# Paged ArcGIS fetch: list every object ID, then request features by ID in
+# pages no larger than the typical service maxRecordCount
+ARCGIS_IDS_SUFFIX = "/query?where=1%3D1&returnIdsOnly=true&f=json"
+ARCGIS_PAGE_SIZE = 1000
+
+STOCKING_UNIQUE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_stocking_natural_key
+    ON stocking_records(lake_name, species, stocking_date)
+"""
+
+# Fixed SQL text so every save hits the connection's prepared-statement cache
+STOCKING_UPSERT_SQL = """
+    INSERT INTO stocking_records 
+    (lake_name, species, stocking_date, fish_size, quantity, latitude, longitude, notes, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(lake_name, species, stocking_date) DO UPDATE SET
+        fish_size = excluded.fish_size,
+        quantity = excluded.quantity,
+        latitude = excluded.latitude,
+        longitude = excluded.longitude,
+        notes = excluded.notes,
+        source = excluded.source,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Concurrent ArcGIS query requests (every format for every service)
+MAX_FETCH_WORKERS = 6
+
+STOCKING_SOURCE = "NH Fish & Game"
+
+# Sample stockings: lake, species, days ago, size, quantity, lat, lon, notes
+_SAMPLE_ROWS = (
+    ("Winnipesaukee", "Rainbow Trout", 5, "8-10 inches", 500, 43.6406, -72.1440, "Stocked in Alton Bay area"),
+    ("Newfound", "Lake Trout", 10, "12-14 inches", 300, 43.7528, -71.7999, "Deep water stocking"),
+    ("Squam", "Brook Trout", 7, "6-8 inches", 400, 43.8280, -71.5503, "Shoreline stocking"),
+    ("Champlain", "Brown Trout", 15, "10-12 inches", 600, 44.4896, -73.3582, "Multiple locations"),
+    ("Mascoma", "Rainbow Trout", 3, "8-10 inches", 250, 43.6587, -72.3200, "Recent stocking"),
+    ("Sunapee", "Lake Trout", 12, "12-14 inches", 350, 43.3770, -72.0850, "Deep water areas"),
+    ("First Connecticut", "Brook Trout", 1, "6-8 inches", 200, 45.0926, -71.2478, "River stocking"),
+)
+
+# Columns returned by get_stocking_data, in table order
+STOCKING_COLUMNS = ("id, lake_name, species, stocking_date, fish_size, quantity, "
+                    "latitude, longitude, notes, source, created_at, updated_at")
+
+# ArcGIS date formats keyed by (separator, index of first separator)
+_DATE_FORMATS = {
+    ('-', 4): '%Y-%m-%d',
+    ('/', 4): '%Y/%m/%d',
+    ('/', 2): '%m/%d/%Y',
+    ('/', 1): '%m/%d/%Y',
+}
+
+def parse_stocking_date(value: str) -> Optional[datetime.date]:
+    """Parse a stocking date string, picking the format from its shape"""
+    sep = '-' if '-' in value else '/'
+    fmt = _DATE_FORMATS.get((sep, value.find(sep)))
+    if fmt is None:
+        return None
+    try:
+        # Zero-padded ISO dates take the C fast path instead of strptime
+        if fmt == '%Y-%m-%d' and len(value) == 10:
+            return datetime.date.fromisoformat(value)
+        return datetime.datetime.strptime(value, fmt).date()
+    except ValueError:
+        return None
+
 @dataclass
 class StockingRecord:
     """Represents a single stocking record"""
@@ -25,90 +105,191 @@ class StockingRecord:
     quantity: int
     coordinates: Optional[Tuple[float, float]] = None
     notes: str = ""
-    source: str = "NH Fish & Game"
+    source: str = STOCKING_SOURCE
 
 class NHStockingData:
     """Handles NH Fish & Game stocking data"""
     
-    def __init__(self, db_path: str = "sqlite_db/stocking_data.db"):
+    def __init__(self, db_path: str = "sqlite_db/stocking_data.db",
+                 enable_sample_fallback: bool = False):
         self.db_path = db_path
+        
+        # Store sample records when the APIs return nothing (development only)
+        self.enable_sample_fallback = enable_sample_fallback
         self.api_urls = [
             "https://nhfg.maps.arcgis.com/rest/services/Stocking_Report/MapServer/0",
             "https://services1.arcgis.com/RbMX0mRVOFNTdLzd/arcgis/rest/services/Stocking_Report/FeatureServer/0"
         ]
+        
+        self.session = make_session()
+        
+        # One connection for the object's lifetime, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = db_connection.connect(self.db_path)
+        atexit.register(self.close)
+        
         self.initialize_database()
     
+    def close(self):
+        """Close the shared HTTP session and database connection"""
+        atexit.unregister(self.close)
+        self.session.close()
+        with self._lock:
+            # Detach first so the instance counts as closed even if closing
+            # raises; a with-block exit followed by the atexit hook lands here twice
+            conn, self._conn = self._conn, None
+            if conn is None:
+                return
+            db_connection.close(conn)
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The shared connection; sqlite3.ProgrammingError once closed"""
+        return db_connection.require_open(self._conn)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
     def initialize_database(self):
         """Initialize the stocking database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stocking_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lake_name TEXT NOT NULL,
-                species TEXT NOT NULL,
-                stocking_date DATE NOT NULL,
-                fish_size TEXT,
-                quantity INTEGER,
-                latitude REAL,
-                longitude REAL,
-                notes TEXT,
-                source TEXT DEFAULT 'NH Fish & Game',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS update_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                update_type TEXT NOT NULL,
-                records_updated INTEGER DEFAULT 0,
-                success BOOLEAN DEFAULT TRUE,
-                error_message TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with self._lock, self.conn as conn:
+            cursor = conn.cursor()
+            
+            # WAL is persistent, so it only needs setting once per database
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS stocking_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lake_name TEXT NOT NULL,
+                    species TEXT NOT NULL,
+                    stocking_date DATE NOT NULL,
+                    fish_size TEXT,
+                    quantity INTEGER,
+                    latitude REAL,
+                    longitude REAL,
+                    notes TEXT,
+                    source TEXT DEFAULT 'NH Fish & Game',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Indexes for per-lake and date-window stocking queries
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_stocking_lake_date
+                ON stocking_records(lake_name, stocking_date DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_stocking_date
+                ON stocking_records(stocking_date)
+            ''')
+            
+            # One row per lake, species and date: the conflict target for the upsert
+            try:
+                cursor.execute(STOCKING_UNIQUE_INDEX_SQL)
+            except sqlite3.IntegrityError:
+                # Older databases hold duplicate rows; keep the newest copy
+                cursor.execute('''
+                    DELETE FROM stocking_records
+                    WHERE id NOT IN (
+                        SELECT MAX(id) FROM stocking_records
+                        GROUP BY lake_name, species, stocking_date
+                    )
+                ''')
+                cursor.execute(STOCKING_UNIQUE_INDEX_SQL)
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS update_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    update_type TEXT NOT NULL,
+                    records_updated INTEGER DEFAULT 0,
+                    success BOOLEAN DEFAULT TRUE,
+                    error_message TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        conn.commit()
-        conn.close()
         logger.info("Stocking database initialized")
     
+    def _fetch_json(self, query_url: str, form: Optional[Dict] = None) -> Optional[Dict]:
+        """GET (or POST form to) a query URL, returning its JSON body or None on failure"""
+        try:
+            if form is None:
+                response = self.session.get(query_url, timeout=10)
+            else:
+                response = self.session.post(query_url, data=form, timeout=10)
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+        except Exception as e:
+            logger.debug("Failed to fetch from %s: %s", query_url, e)
+        return None
+    
     def fetch_api_data(self) -> List[Dict]:
         """Attempt to fetch data from NH Fish & Game APIs"""
         all_data = []
+        unpaged_urls = []
         
-        for url in self.api_urls:
-            try:
-                # Try different query formats
-                query_urls = [
-                    f"{url}/query?where=1%3D1&outFields=*&f=json",
-                    f"{url}/query?where=1%3D1&outFields=*&returnGeometry=true&f=json",
-                    f"{url}?f=json"
-                ]
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            # List object IDs for every service, then fetch features a page
+            # of IDs at a time so results are not truncated at maxRecordCount
+            id_fetches = [(url, executor.submit(self._fetch_json, url + ARCGIS_IDS_SUFFIX))
+                          for url in self.api_urls]
+            
+            page_fetches = []
+            for url, future in id_fetches:
+                object_ids = (future.result() or {}).get('objectIds')
+                if not object_ids:
+                    unpaged_urls.append(url)
+                    continue
                 
-                for query_url in query_urls:
-                    try:
-                        response = requests.get(query_url, timeout=10)
-                        if response.status_code == 200:
-                            data = response.json()
-                            logger.info(f"Successfully fetched data from {url}")
-                            all_data.append(data)
-                            break
-                    except Exception as e:
-                        logger.debug(f"Failed to fetch from {query_url}: {e}")
-                        continue
-                        
-            except Exception as e:
-                logger.warning(f"Failed to fetch from {url}: {e}")
-                continue
+                page_fetches.append((url, [
+                    executor.submit(self._fetch_json, f"{url}/query", {
+                        'objectIds': ','.join(map(str, object_ids[i:i + ARCGIS_PAGE_SIZE])),
+                        'outFields': '*',
+                        'returnGeometry': 'true',
+                        'f': 'json'
+                    })
+                    for i in range(0, len(object_ids), ARCGIS_PAGE_SIZE)
+                ]))
+            
+            for url, futures in page_fetches:
+                pages = [future.result() for future in futures]
+                if all(page is not None and 'features' in page for page in pages):
+                    logger.info("Successfully fetched %d pages from %s", len(pages), url)
+                    all_data.append({'features': [feature for page in pages
+                                                  for feature in page['features']]})
+                else:
+                    unpaged_urls.append(url)
+            
+            # Services that could not be paged: request every query format at
+            # once, then take the first that succeeded in preference order
+            fetches = [(url, [executor.submit(self._fetch_json, url + suffix)
+                              for suffix in ARCGIS_QUERY_SUFFIXES])
+                       for url in unpaged_urls]
+            
+            for url, futures in fetches:
+                for future in futures:
+                    data = future.result()
+                    if data is not None:
+                        logger.info("Successfully fetched data from %s", url)
+                        all_data.append(data)
+                        break
+                
+                for future in futures:
+                    future.cancel()
         
         return all_data
     
-    def parse_arcgis_data(self, data: Dict) -> List[StockingRecord]:
-        """Parse ArcGIS data into StockingRecord objects"""
-        records = []
+    def parse_arcgis_rows(self, data: Dict) -> List[Tuple]:
+        """Parse ArcGIS data straight into stocking_records rows"""
+        rows = []
+        
+        # Features repeat the same few stocking dates, so parse each string once
+        date_cache = {}
         
         try:
             features = data.get('features', [])
@@ -127,64 +308,69 @@ class NHStockingData:
                     notes = attributes.get('NOTES', '')
                     
                     # Parse coordinates
-                    coordinates = None
+                    latitude = longitude = None
                     if geometry:
                         if 'x' in geometry and 'y' in geometry:
-                            coordinates = (geometry['x'], geometry['y'])
+                            latitude, longitude = geometry['x'], geometry['y']
                         elif 'coordinates' in geometry:
                             coords = geometry['coordinates']
                             if len(coords) >= 2:
-                                coordinates = (coords[0], coords[1])
+                                latitude, longitude = coords[0], coords[1]
                     
                     # Parse date
                     stocking_date = None
-                    if stocking_date_str:
-                        try:
-                            # Try different date formats
-                            for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']:
-                                try:
-                                    stocking_date = datetime.datetime.strptime(stocking_date_str, fmt).date()
-                                    break
-                                except ValueError:
-                                    continue
-                        except Exception as e:
-                            logger.debug(f"Failed to parse date {stocking_date_str}: {e}")
+                    if isinstance(stocking_date_str, str) and stocking_date_str:
+                        if stocking_date_str not in date_cache:
+                            date_cache[stocking_date_str] = parse_stocking_date(stocking_date_str)
+                        stocking_date = date_cache[stocking_date_str]
+                        if stocking_date is None:
+                            logger.debug("Failed to parse date %s", stocking_date_str)
                     
                     if lake_name and species and stocking_date:
-                        record = StockingRecord(
-                            lake_name=lake_name,
-                            species=species,
-                            stocking_date=stocking_date,
-                            fish_size=fish_size or "Unknown",
-                            quantity=quantity or 0,
-                            coordinates=coordinates,
-                            notes=notes
-                        )
-                        records.append(record)
+                        rows.append((
+                            lake_name,
+                            species,
+                            stocking_date.isoformat(),
+                            fish_size or "Unknown",
+                            quantity or 0,
+                            latitude,
+                            longitude,
+                            notes,
+                            STOCKING_SOURCE
+                        ))
                         
                 except Exception as e:
-                    logger.debug(f"Failed to parse feature: {e}")
+                    logger.debug("Failed to parse feature: %s", e)
                     continue
                     
         except Exception as e:
-            logger.error(f"Failed to parse ArcGIS data: {e}")
+            logger.error("Failed to parse ArcGIS data: %s", e)
         
-        return records
+        return rows
+    
+    def parse_arcgis_data(self, data: Dict) -> List[StockingRecord]:
+        """Parse ArcGIS data into StockingRecord objects"""
+        return [
+            StockingRecord(
+                lake_name=lake_name,
+                species=species,
+                stocking_date=datetime.date.fromisoformat(stocking_date),
+                fish_size=fish_size,
+                quantity=quantity,
+                coordinates=(latitude, longitude) if latitude is not None else None,
+                notes=notes,
+                source=source
+            )
+            for lake_name, species, stocking_date, fish_size, quantity,
+                latitude, longitude, notes, source in self.parse_arcgis_rows(data)
+        ]
     
     def save_records(self, records: List[StockingRecord]) -> int:
         """Save stocking records to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        saved_count = 0
-        
+        rows = []
         for record in records:
             try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO stocking_records 
-                    (lake_name, species, stocking_date, fish_size, quantity, latitude, longitude, notes, source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     record.lake_name,
                     record.species,
                     record.stocking_date.isoformat(),
@@ -195,29 +381,30 @@ class NHStockingData:
                     record.notes,
                     record.source
                 ))
-                saved_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to save record: {e}")
+            except (AttributeError, TypeError, IndexError) as e:
+                logger.error("Failed to save record: %s", e)
                 continue
         
-        conn.commit()
-        conn.close()
+        return self.save_rows(rows)
+    
+    def save_rows(self, rows: List[Tuple]) -> int:
+        """Save stocking_records rows (as built by parse_arcgis_rows) to database"""
+        with progress_point('stocking.save'), self._lock, self.conn as conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany(STOCKING_UPSERT_SQL, rows)
         
-        return saved_count
+        return len(rows)
     
     def log_update(self, update_type: str, records_updated: int, success: bool = True, error_message: str = None):
         """Log update activity"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO update_log (update_type, records_updated, success, error_message)
-            VALUES (?, ?, ?, ?)
-        ''', (update_type, records_updated, success, error_message))
-        
-        conn.commit()
-        conn.close()
+        with self._lock, self.conn as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO update_log (update_type, records_updated, success, error_message)
+                VALUES (?, ?, ?, ?)
+            ''', (update_type, records_updated, success, error_message))
     
     def update_stocking_data(self) -> Dict:
         """Update stocking data from NH Fish & Game"""
@@ -225,32 +412,38 @@ class NHStockingData:
         
         try:
             # Fetch data from APIs
-            api_data = self.fetch_api_data()
+            with progress_point('stocking.fetch'):
+                api_data = self.fetch_api_data()
             
-            # Parse API data
-            records = []
-            if api_data:
-                for data in api_data:
-                    parsed_records = self.parse_arcgis_data(data)
-                    records.extend(parsed_records)
+            # Parse API data straight into database rows
+            rows = []
+            with progress_point('stocking.parse'):
+                if api_data:
+                    for data in api_data:
+                        rows.extend(self.parse_arcgis_rows(data))
             
-            # If no records from API, use sample data
-            if not records:
+            # Save records, falling back to sample data if the API gave none
+            if rows:
+                source = 'api'
+                saved_count = self.save_rows(rows)
+            elif self.enable_sample_fallback:
                 logger.warning("No usable API data available, using sample data")
-                records = self.generate_sample_data()
-            
-            # Save records
-            saved_count = self.save_records(records)
+                source = 'sample'
+                saved_count = self.save_records(self.generate_sample_data())
+            else:
+                logger.warning("No usable API data available")
+                source = 'none'
+                saved_count = 0
             
             # Log successful update
             self.log_update("api_update", saved_count, True)
             
-            logger.info(f"Stocking data update completed: {saved_count} records saved")
+            logger.info("Stocking data update completed: %s records saved", saved_count)
             
             return {
                 'success': True,
                 'records_updated': saved_count,
-                'source': 'sample' if not api_data or not records else 'api'
+                'source': source
             }
             
         except Exception as e:
@@ -264,134 +457,57 @@ class NHStockingData:
                 'records_updated': 0
             }
     
-    def generate_sample_data(self) -> List[StockingRecord]:
+    def generate_sample_data(self) -> Iterator[StockingRecord]:
         """Generate sample stocking data for testing"""
         # Get current date for recent stockings
         today = datetime.date.today()
         
-        sample_records = [
-            StockingRecord(
-                lake_name="Winnipesaukee",
-                species="Rainbow Trout",
-                stocking_date=today - datetime.timedelta(days=5),
-                fish_size="8-10 inches",
-                quantity=500,
-                coordinates=(43.6406, -72.1440),
-                notes="Stocked in Alton Bay area"
-            ),
-            StockingRecord(
-                lake_name="Newfound",
-                species="Lake Trout",
-                stocking_date=today - datetime.timedelta(days=10),
-                fish_size="12-14 inches",
-                quantity=300,
-                coordinates=(43.7528, -71.7999),
-                notes="Deep water stocking"
-            ),
-            StockingRecord(
-                lake_name="Squam",
-                species="Brook Trout",
-                stocking_date=today - datetime.timedelta(days=7),
-                fish_size="6-8 inches",
-                quantity=400,
-                coordinates=(43.8280, -71.5503),
-                notes="Shoreline stocking"
-            ),
-            StockingRecord(
-                lake_name="Champlain",
-                species="Brown Trout",
-                stocking_date=today - datetime.timedelta(days=15),
-                fish_size="10-12 inches",
-                quantity=600,
-                coordinates=(44.4896, -73.3582),
-                notes="Multiple locations"
-            ),
-            StockingRecord(
-                lake_name="Mascoma",
-                species="Rainbow Trout",
-                stocking_date=today - datetime.timedelta(days=3),
-                fish_size="8-10 inches",
-                quantity=250,
-                coordinates=(43.6587, -72.3200),
-                notes="Recent stocking"
-            ),
-            StockingRecord(
-                lake_name="Sunapee",
-                species="Lake Trout",
-                stocking_date=today - datetime.timedelta(days=12),
-                fish_size="12-14 inches",
-                quantity=350,
-                coordinates=(43.3770, -72.0850),
-                notes="Deep water areas"
-            ),
-            StockingRecord(
-                lake_name="First Connecticut",
-                species="Brook Trout",
-                stocking_date=today - datetime.timedelta(days=1),
-                fish_size="6-8 inches",
-                quantity=200,
-                coordinates=(45.0926, -71.2478),
-                notes="River stocking"
+        for lake_name, species, days_ago, fish_size, quantity, lat, lon, notes in _SAMPLE_ROWS:
+            yield StockingRecord(
+                lake_name=lake_name,
+                species=species,
+                stocking_date=today - datetime.timedelta(days=days_ago),
+                fish_size=fish_size,
+                quantity=quantity,
+                coordinates=(lat, lon),
+                notes=notes
             )
-        ]
-        
-        return sample_records
     
     def get_stocking_data(self, lake_name: str = None, days_back: int = 30) -> List[Dict]:
         """Get stocking data from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if lake_name:
-            cursor.execute('''
-                SELECT * FROM stocking_records 
-                WHERE lake_name = ? 
-                AND stocking_date >= date('now', '-{} days')
-                ORDER BY stocking_date DESC
-            '''.format(days_back), (lake_name,))
-        else:
-            cursor.execute('''
-                SELECT * FROM stocking_records 
-                WHERE stocking_date >= date('now', '-{} days')
-                ORDER BY stocking_date DESC
-            '''.format(days_back))
-        
-        records = cursor.fetchall()
-        conn.close()
-        
-        # Convert to dictionary format
-        result = []
-        for record in records:
-            result.append({
-                'id': record[0],
-                'lake_name': record[1],
-                'species': record[2],
-                'stocking_date': record[3],
-                'fish_size': record[4],
-                'quantity': record[5],
-                'latitude': record[6],
-                'longitude': record[7],
-                'notes': record[8],
-                'source': record[9],
-                'created_at': record[10],
-                'updated_at': record[11]
-            })
-        
-        return result
+        with self._lock, self.conn as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            if lake_name:
+                cursor.execute(f'''
+                    SELECT {STOCKING_COLUMNS} FROM stocking_records 
+                    WHERE lake_name = ? 
+                    AND stocking_date >= date('now', ?)
+                    ORDER BY stocking_date DESC
+                ''', (lake_name, f'-{int(days_back)} days'))
+            else:
+                cursor.execute(f'''
+                    SELECT {STOCKING_COLUMNS} FROM stocking_records 
+                    WHERE stocking_date >= date('now', ?)
+                    ORDER BY stocking_date DESC
+                ''', (f'-{int(days_back)} days',))
+            
+            # Convert to dictionary format straight off the cursor
+            return [dict(row) for row in cursor]
     
     def get_update_status(self) -> Dict:
         """Get the status of the last update"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM update_log 
-            ORDER BY timestamp DESC 
-            LIMIT 1
-        ''')
-        
-        record = cursor.fetchone()
-        conn.close()
+        with self._lock, self.conn as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT * FROM update_log 
+                ORDER BY timestamp DESC 
+                LIMIT 1
+            ''')
+            
+            record = cursor.fetchone()
         
         if record:
             return {
@@ -414,16 +530,15 @@ def main():
     """Test the stocking data module"""
     logging.basicConfig(level=logging.INFO)
     
-    stocking_data = NHStockingData()
-    
-    # Update data
-    result = stocking_data.update_stocking_data()
-    
-    # Get data for Winnipesaukee
-    data = stocking_data.get_stocking_data("Winnipesaukee")
-    
-    # Get update status
-    status = stocking_data.get_update_status()
+    with NHStockingData() as stocking_data:
+        # Update data
+        result = stocking_data.update_stocking_data()
+        
+        # Get data for Winnipesaukee
+        data = stocking_data.get_stocking_data("Winnipesaukee")
+        
+        # Get update status
+        status = stocking_data.get_update_status()
 
 if __name__ == "__main__":
     main()
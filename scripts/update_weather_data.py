@@ -7,10 +7,14 @@ Fetches current weather data from OpenWeatherMap API and updates the database
 import os
 import sys
 import json
+import logging
+import logging.handlers
 import time
-import requests
-import datetime
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
+from http_session import make_session
 from working_database import WorkingWeatherDatabase
 
 # Add the website directory to Python path
@@ -18,13 +22,44 @@ website_dir = "/var/www/fishing.thepeaveys.net/public_html"
 if website_dir not in sys.path:
     sys.path.insert(0, website_dir)
 
+logger = logging.getLogger("update_weather_data")
+
+# Concurrent location fetches
+MAX_FETCH_WORKERS = 8
+
+# In-flight OpenWeatherMap requests allowed at once (API rate limits)
+MAX_CONCURRENT_REQUESTS = 5
+
+# Fishing score bands. Wind limits are inclusive upper bounds; temperature and
+# pressure scores are indexed by how many band edges a reading lies past.
+_WIND_LIMITS = (4, 6, 8, 10)
+_WIND_SCORES = (100, 80, 60, 40, 20)
+_TEMP_SCORES = (60, 80, 100, 80, 60)
+_PRESSURE_SCORES = (100, 80, 60)
+
+# Weighted-score floors for each rating above "Poor Fishing"
+_RATING_FLOORS = (50, 60, 70, 80, 90)
+_RATINGS = ("Poor Fishing", "Moderate Fishing", "Fair Fishing",
+            "Good Fishing", "Great Fishing", "Excellent Fishing")
+
+def rating_for_score(total_score: float) -> str:
+    """Convert a weighted fishing score to its rating"""
+    return _RATINGS[bisect_right(_RATING_FLOORS, total_score)]
+
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+def format_date(ts: int) -> str:
+    """Format an epoch timestamp as the display date stored in date_str"""
+    t = time.localtime(ts)
+    return f"{_WEEKDAYS[t.tm_wday]} {t.tm_mon:02d}-{t.tm_mday:02d}-{t.tm_year}"
+
 class WeatherDataUpdater:
     def __init__(self):
         self.api_key = os.getenv('OPENWEATHER_API_KEY')
         if not self.api_key:
-            print("❌ OPENWEATHER_API_KEY environment variable not set")
-            print("Please set your OpenWeatherMap API key:")
-            print("export OPENWEATHER_API_KEY='your_api_key_here'")
+            logger.error("OPENWEATHER_API_KEY environment variable not set")
+            logger.error("Please set your OpenWeatherMap API key:")
+            logger.error("export OPENWEATHER_API_KEY='your_api_key_here'")
             sys.exit(1)
         
         self.base_url = "https://api.openweathermap.org/data/2.5"
@@ -38,13 +73,23 @@ class WeatherDataUpdater:
             {"name": "First Connecticut", "lat": 45.0926, "lon": -71.2478}
         ]
         
+        self.session = make_session(MAX_FETCH_WORKERS, MAX_FETCH_WORKERS)
+        
+        self._request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        
         # Initialize database
         self.db = WorkingWeatherDatabase("../sqlite_db/weather_data.db")
         
+    def _api_get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET an OpenWeatherMap endpoint, limiting concurrent requests"""
+        with self._request_slots:
+            response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
     def get_current_weather(self, lat: float, lon: float) -> Dict[str, Any]:
         """Fetch current weather from OpenWeatherMap API"""
         try:
-            url = f"{self.base_url}/weather"
             params = {
                 'lat': lat,
                 'lon': lon,
@@ -52,10 +97,7 @@ class WeatherDataUpdater:
                 'units': 'imperial'  # Use Fahrenheit
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._api_get('weather', params)
             
             # Extract relevant weather data
             weather_data = {
@@ -64,20 +106,19 @@ class WeatherDataUpdater:
                 'wind_speed': data['wind']['speed'],
                 'wind_gust': data['wind'].get('gust', data['wind']['speed']),
                 'summary': data['weather'][0]['description'],
-                'sunrise': datetime.datetime.fromtimestamp(data['sys']['sunrise']).strftime('%H:%M'),
-                'created_at': datetime.datetime.now()
+                'sunrise': time.strftime('%H:%M', time.localtime(data['sys']['sunrise'])),
+                'date_ts': data['dt']  # Observation time, epoch seconds
             }
             
             return weather_data
             
         except Exception as e:
-            print(f"❌ Error fetching weather for {lat}, {lon}: {e}")
+            logger.error("Error fetching weather for %s, %s: %s", lat, lon, e)
             return None
     
     def get_forecast_weather(self, lat: float, lon: float) -> List[Dict[str, Any]]:
         """Fetch 8-day forecast from OpenWeatherMap API"""
         try:
-            url = f"{self.base_url}/forecast"
             params = {
                 'lat': lat,
                 'lon': lon,
@@ -86,10 +127,7 @@ class WeatherDataUpdater:
                 'cnt': 8  # 8 days
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._api_get('forecast', params)
             forecast_data = []
             
             for item in data['list']:
@@ -102,76 +140,54 @@ class WeatherDataUpdater:
                         'wind_gust': item['wind'].get('gust', item['wind']['speed']),
                         'summary': item['weather'][0]['description'],
                         'sunrise': 'N/A',  # Forecast API doesn't include sunrise data
-                        'created_at': datetime.datetime.fromtimestamp(item['dt'])
+                        'date_ts': item['dt']
                     }
                     forecast_data.append(weather_data)
             
             return forecast_data
             
         except Exception as e:
-            print(f"❌ Error fetching forecast for {lat}, {lon}: {e}")
+            logger.error("Error fetching forecast for %s, %s: %s", lat, lon, e)
             return []
     
     def calculate_fishing_rating(self, wind_speed: float, temp: float, pressure: float) -> str:
         """Calculate fishing rating based on weather conditions"""
         # Wind speed is the most important factor (60% weight)
-        if wind_speed <= 4:
-            wind_score = 100
-        elif wind_speed <= 6:
-            wind_score = 80
-        elif wind_speed <= 8:
-            wind_score = 60
-        elif wind_speed <= 10:
-            wind_score = 40
-        else:
-            wind_score = 20
+        wind_score = _WIND_SCORES[bisect_left(_WIND_LIMITS, wind_speed)]
         
-        # Temperature factor (15% weight)
-        if 50 <= temp <= 75:
-            temp_score = 100
-        elif 40 <= temp <= 85:
-            temp_score = 80
-        else:
-            temp_score = 60
+        # Temperature factor (15% weight): 50-75 best, 40-85 good
+        temp_score = _TEMP_SCORES[(temp >= 40) + (temp >= 50) + (temp > 75) + (temp > 85)]
         
-        # Pressure factor (10% weight)
-        if pressure < 29.8:
-            pressure_score = 100  # Low pressure is good for fishing
-        elif pressure <= 30.2:
-            pressure_score = 80
-        else:
-            pressure_score = 60
+        # Pressure factor (10% weight): low pressure is good for fishing
+        pressure_score = _PRESSURE_SCORES[(pressure >= 29.8) + (pressure > 30.2)]
         
         # Calculate weighted score
         total_score = (wind_score * 0.6) + (temp_score * 0.15) + (pressure_score * 0.1)
         
-        # Convert to rating
-        if total_score >= 90:
-            return "Excellent Fishing"
-        elif total_score >= 80:
-            return "Great Fishing"
-        elif total_score >= 70:
-            return "Good Fishing"
-        elif total_score >= 60:
-            return "Fair Fishing"
-        elif total_score >= 50:
-            return "Moderate Fishing"
-        else:
-            return "Poor Fishing"
+        return rating_for_score(total_score)
+    
+    def calculate_fishing_ratings(self, readings: List[Dict[str, Any]]) -> List[str]:
+        """Calculate fishing ratings for a list of weather readings"""
+        rate = self.calculate_fishing_rating
+        return [rate(r['wind_speed'], r['temp'], r['pressure']) for r in readings]
     
     def update_weather_data(self):
         """Update weather data for all locations"""
-        print("🚀 Starting weather data update...")
-        print(f"⏰ Update time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 60)
+        logger.info("Starting weather data update")
         
-        total_updated = 0
+        records = []
         
-        for location in self.locations:
-            print(f"\n📍 Updating {location['name']}...")
-            
-            # Get current weather
-            current_weather = self.get_current_weather(location['lat'], location['lon'])
+        # Current and forecast calls are independent, so fetch both for every
+        # location concurrently; results keep self.locations order
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            fetches = [(location,
+                        executor.submit(self.get_current_weather, location['lat'], location['lon']),
+                        executor.submit(self.get_forecast_weather, location['lat'], location['lon']))
+                       for location in self.locations]
+            results = [(location, current.result(), forecast.result())
+                       for location, current, forecast in fetches]
+        
+        for location, current_weather, forecast_weather in results:
             if current_weather:
                 # Calculate fishing rating
                 fishing_rating = self.calculate_fishing_rating(
@@ -183,8 +199,8 @@ class WeatherDataUpdater:
                 # Prepare record for database
                 record = {
                     'location': location['name'],
-                    'date_ts': current_weather['created_at'],
-                    'date_str': current_weather['created_at'].strftime('%A %m-%d-%Y'),
+                    'date_ts': current_weather['date_ts'],
+                    'date_str': format_date(current_weather['date_ts']),
                     'sunrise': current_weather['sunrise'],
                     'summary': current_weather['summary'],
                     'temp': current_weather['temp'],
@@ -195,31 +211,18 @@ class WeatherDataUpdater:
                     'fishing_rating': fishing_rating
                 }
                 
-                # Store in database
-                if self.db.store_weather_data([record]):
-                    print(f"✅ Current weather updated: {fishing_rating}")
-                    total_updated += 1
-                else:
-                    print("❌ Failed to store current weather")
+                records.append(record)
+                logger.info("%s: current weather %s", location['name'], fishing_rating)
             
-            # Get forecast weather
-            forecast_weather = self.get_forecast_weather(location['lat'], location['lon'])
-            if forecast_weather:
-                forecast_records = []
-                for i, forecast in enumerate(forecast_weather):
-                    # Calculate fishing rating for forecast
-                    fishing_rating = self.calculate_fishing_rating(
-                        forecast['wind_speed'],
-                        forecast['temp'],
-                        forecast['pressure']
-                    )
-                    
+            if current_weather and forecast_weather:
+                forecast_ratings = self.calculate_fishing_ratings(forecast_weather)
+                for i, (forecast, fishing_rating) in enumerate(zip(forecast_weather, forecast_ratings)):
                     # Create forecast record
-                    forecast_date = current_weather['created_at'] + datetime.timedelta(days=i+1)
+                    forecast_ts = current_weather['date_ts'] + (i + 1) * 86400
                     record = {
                         'location': location['name'],
-                        'date_ts': forecast_date,
-                        'date_str': forecast_date.strftime('%A %m-%d-%Y'),
+                        'date_ts': forecast_ts,
+                        'date_str': format_date(forecast_ts),
                         'sunrise': forecast['sunrise'],
                         'summary': forecast['summary'],
                         'temp': forecast['temp'],
@@ -229,35 +232,41 @@ class WeatherDataUpdater:
                         'fishing_base': fishing_rating,
                         'fishing_rating': fishing_rating
                     }
-                    forecast_records.append(record)
+                    records.append(record)
                 
-                # Store forecast in database
-                if self.db.store_weather_data(forecast_records):
-                    print(f"✅ Forecast updated: {len(forecast_records)} days")
-                    total_updated += len(forecast_records)
-                else:
-                    print("❌ Failed to store forecast")
-            
-            # Rate limiting to avoid API limits
-            time.sleep(1)
+                logger.info("%s: forecast %d days", location['name'], len(forecast_weather))
         
-        print("\n" + "=" * 60)
-        print(f"🏁 Weather data update completed!")
-        print(f"📊 Total records updated: {total_updated}")
-        print(f"⏰ Completed at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        # Store every location in one transaction
+        if self.db.store_weather_data(records):
+            total_updated = len(records)
+        else:
+            total_updated = 0
+            logger.error("Failed to store weather data")
+        
+        logger.info("Weather data update completed: %s records updated", total_updated)
         
         return total_updated
 
 def main():
     """Main function"""
+    # Buffer log records and write them out in one go at exit (or on error)
+    # rather than a stdout write per line
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[logging.handlers.MemoryHandler(
+            capacity=1000, flushLevel=logging.ERROR, target=output)]
+    )
+    
     try:
         updater = WeatherDataUpdater()
         updater.update_weather_data()
     except KeyboardInterrupt:
-        print("\n\n⏹️ Update interrupted by user")
+        logger.error("Update interrupted by user")
         sys.exit(1)
     except Exception as e:
-        print(f"\n\n💥 Unexpected error during update: {str(e)}")
+        logger.error("Unexpected error during update: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
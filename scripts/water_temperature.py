@@ -4,18 +4,50 @@ Water Temperature Data Module
 Integrates USGS, NOAA, and estimation models for water temperature data
 """
 
+import atexit
 import os
+import re
 import json
 import datetime
 import logging
-import requests
+import orjson
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import math
+import time
+from http_session import make_session
 
 logger = logging.getLogger("water_temperature")
 
+UNIQUE_READING_INDEX_SQL = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_wt_reading
+    ON water_temperature_records(lake_name, source, timestamp)
+'''
+
+# Concurrent USGS/NOAA fetches during an update
+MAX_FETCH_WORKERS = 8
+
+# USGS instantaneous values service, water temperature (00010); takes a
+# comma-separated list of site IDs
+USGS_IV_URL = "https://waterservices.usgs.gov/nwis/iv/?format=json&sites={}&parameterCd=00010"
+
+# Seconds a fetched response is reused (USGS updates hourly, NDBC buoys ~10 min)
+USGS_CACHE_TTL = 1800
+NOAA_CACHE_TTL = 600
+
+# Seasonal water temperature factor by day of year (1-366); the peak water
+# temperature for NH/VT lakes typically occurs in August (day ~220)
+_SEASONAL_FACTORS = tuple(math.cos((day - 220) * 2 * math.pi / 365) for day in range(367))
+
+# NDBC realtime2 data line: YY MM DD hh mm WDIR WSPD GST WVHT DPD APD MWD PRES ATMP WTMP ...
+# Captures the timestamp fields and WTMP (column 14, 0-indexed)
+_NOAA_LINE_RE = re.compile(
+    rb'^(\d{4})\s+(\d{2})\s+(\d{2})\s+(\d{2})\s+(\d{2})(?:\s+\S+){9}\s+(-?\d+(?:\.\d+)?)(?!\S)',
+    re.MULTILINE)
+
 @dataclass
 class WaterTemperatureRecord:
     """Represents a water temperature reading"""
@@ -46,6 +78,8 @@ class WaterTemperatureData:
             "First Connecticut": "01144000",  # CONNECTICUT RIVER AT NORTH STRATFORD NH
         }
         
+        self._usgs_lakes = {site_id: name for name, site_id in self.usgs_sites.items()}
+        
         # NOAA buoy mappings
         self.noaa_buoys = {
             "Champlain": "45012",  # Lake Champlain buoy
@@ -63,44 +97,164 @@ class WaterTemperatureData:
             "First Connecticut": {"max_depth": 20, "avg_depth": 10, "surface_area": 0.5},
         }
         
+        # Lake-specific estimation adjustments (more realistic for NH/VT lakes)
+        self.lake_adjustments = {
+            "Winnipesaukee": {"base_temp": 12, "seasonal_range": 10, "depth_factor": 0.8},  # Large, deep lake
+            "Newfound": {"base_temp": 11, "seasonal_range": 9, "depth_factor": 0.7},        # Deep, clear lake
+            "Squam": {"base_temp": 12, "seasonal_range": 10, "depth_factor": 0.8},          # Deep, clear lake
+            "Champlain": {"base_temp": 14, "seasonal_range": 11, "depth_factor": 0.9},      # Large lake
+            "Mascoma": {"base_temp": 13, "seasonal_range": 10, "depth_factor": 1.0},       # Smaller lake
+            "Sunapee": {"base_temp": 11, "seasonal_range": 9, "depth_factor": 0.7},        # Deep, clear lake
+            "First Connecticut": {"base_temp": 15, "seasonal_range": 12, "depth_factor": 1.1},  # River system
+        }
+        self.default_adjustment = {"base_temp": 15, "seasonal_range": 12, "depth_factor": 0.8}
+        
+        # Estimation coefficients per known lake, built once
+        self._estimate_params = {name: self._estimation_params(name) for name in self.lake_adjustments}
+        
+        self.session = make_session()
+        self._response_cache: Dict[str, Tuple[float, object]] = {}
+        
+        # One connection for the object's lifetime, serialized by a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # No fsync per commit in WAL mode
+        atexit.register(self.close)
+        
         self.initialize_database()
     
+    def close(self):
+        """Close the shared HTTP session and database connection"""
+        atexit.unregister(self.close)
+        self.session.close()
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _cached(self, url: str, ttl: float, fetch):
+        """Return fetch(url), reusing a non-None result for ttl seconds"""
+        now = time.monotonic()
+        cached = self._response_cache.get(url)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        result = fetch(url)
+        if result is not None:
+            self._response_cache[url] = (now + ttl, result)
+        return result
+    
+    def _fetch_json(self, url: str) -> Optional[Dict]:
+        """GET a URL and decode its JSON body, or None on a non-200 status"""
+        response = self.session.get(url, timeout=10)
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        return None
+    
+    def _fetch_noaa_match(self, url: str) -> Optional[re.Match]:
+        """Stream an NDBC realtime2 file, stopping at the newest data line
+        with a numeric water temperature ("MM" readings don't match)"""
+        with self.session.get(url, stream=True, timeout=10) as response:
+            if response.status_code == 200:
+                for line in response.iter_lines():
+                    match = _NOAA_LINE_RE.match(line)
+                    if match:
+                        return match
+        return None
+    
     def initialize_database(self):
         """Initialize the water temperature database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS water_temperature_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lake_name TEXT NOT NULL,
-                temperature_celsius REAL NOT NULL,
-                temperature_fahrenheit REAL NOT NULL,
-                timestamp TIMESTAMP NOT NULL,
-                source TEXT NOT NULL,
-                latitude REAL,
-                longitude REAL,
-                depth REAL,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS temperature_update_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                update_type TEXT NOT NULL,
-                records_updated INTEGER DEFAULT 0,
-                success BOOLEAN DEFAULT TRUE,
-                error_message TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            
+            # WAL is persistent, so every later connection gets it too
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS water_temperature_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lake_name TEXT NOT NULL,
+                    temperature_celsius REAL NOT NULL,
+                    temperature_fahrenheit REAL NOT NULL,
+                    timestamp TIMESTAMP NOT NULL,
+                    source TEXT NOT NULL,
+                    latitude REAL,
+                    longitude REAL,
+                    depth REAL,
+                    notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Index for per-lake timestamp range filters (days_back)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_wt_lake_ts
+                ON water_temperature_records(lake_name, timestamp DESC)
+            ''')
+            
+            # One row per reading, so repeat fetches of the same USGS/NOAA
+            # reading update it in place
+            try:
+                cursor.execute(UNIQUE_READING_INDEX_SQL)
+            except sqlite3.IntegrityError:
+                # Older databases hold duplicate readings; keep the newest copy
+                cursor.execute('''
+                    DELETE FROM water_temperature_records
+                    WHERE id NOT IN (
+                        SELECT MAX(id) FROM water_temperature_records
+                        GROUP BY lake_name, source, timestamp
+                    )
+                ''')
+                cursor.execute(UNIQUE_READING_INDEX_SQL)
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS temperature_update_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    update_type TEXT NOT NULL,
+                    records_updated INTEGER DEFAULT 0,
+                    success BOOLEAN DEFAULT TRUE,
+                    error_message TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            self.conn.commit()
         logger.info("Water temperature database initialized")
     
+    def _parse_usgs_series(self, lake_name: str, series: Dict) -> Optional[WaterTemperatureRecord]:
+        """Build a record from one USGS timeSeries entry"""
+        values = series.get('values', [{}])[0].get('value', [])
+        if not values:
+            return None
+        
+        latest = values[0]
+        temp_celsius = float(latest.get('value', 0))
+        temp_fahrenheit = (temp_celsius * 9/5) + 32
+        
+        # Parse timestamp
+        timestamp_str = latest.get('dateTime', '')
+        timestamp = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        
+        # Get location info
+        source_info = series.get('sourceInfo', {})
+        geo_location = source_info.get('geoLocation', {}).get('geogLocation', {})
+        latitude = geo_location.get('latitude')
+        longitude = geo_location.get('longitude')
+        
+        return WaterTemperatureRecord(
+            lake_name=lake_name,
+            temperature_celsius=temp_celsius,
+            temperature_fahrenheit=temp_fahrenheit,
+            timestamp=timestamp,
+            source="USGS",
+            latitude=latitude,
+            longitude=longitude
+        )
+    
     def fetch_usgs_temperature(self, lake_name: str) -> Optional[WaterTemperatureRecord]:
         """Fetch water temperature from USGS API"""
         site_id = self.usgs_sites.get(lake_name)
@@ -108,48 +262,65 @@ class WaterTemperatureData:
             return None
         
         try:
-            url = f"https://waterservices.usgs.gov/nwis/iv/?format=json&sites={site_id}&parameterCd=00010"
-            response = requests.get(url, timeout=10)
+            data = self._cached(USGS_IV_URL.format(site_id), USGS_CACHE_TTL, self._fetch_json)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if data:
                 # Parse USGS response
                 time_series = data.get('value', {}).get('timeSeries', [])
                 if time_series:
-                    series = time_series[0]
-                    values = series.get('values', [{}])[0].get('value', [])
-                    
-                    if values:
-                        latest = values[0]
-                        temp_celsius = float(latest.get('value', 0))
-                        temp_fahrenheit = (temp_celsius * 9/5) + 32
-                        
-                        # Parse timestamp
-                        timestamp_str = latest.get('dateTime', '')
-                        timestamp = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        
-                        # Get location info
-                        source_info = series.get('sourceInfo', {})
-                        geo_location = source_info.get('geoLocation', {}).get('geogLocation', {})
-                        latitude = geo_location.get('latitude')
-                        longitude = geo_location.get('longitude')
-                        
-                        return WaterTemperatureRecord(
-                            lake_name=lake_name,
-                            temperature_celsius=temp_celsius,
-                            temperature_fahrenheit=temp_fahrenheit,
-                            timestamp=timestamp,
-                            source="USGS",
-                            latitude=latitude,
-                            longitude=longitude
-                        )
+                    return self._parse_usgs_series(lake_name, time_series[0])
             
         except Exception as e:
-            logger.warning(f"Failed to fetch USGS data for {lake_name}: {e}")
+            logger.warning("Failed to fetch USGS data for %s: %s", lake_name, e)
         
         return None
     
+    def fetch_usgs_temperatures(self, lake_names: List[str]) -> Dict[str, WaterTemperatureRecord]:
+        """Fetch water temperatures for several lakes with one multi-site USGS request"""
+        site_ids = [self.usgs_sites[name] for name in lake_names if self.usgs_sites.get(name)]
+        if not site_ids:
+            return {}
+        
+        records = {}
+        try:
+            data = self._cached(USGS_IV_URL.format(','.join(site_ids)), USGS_CACHE_TTL, self._fetch_json)
+            
+            if data:
+                self._cache_usgs_sites(data)
+                for series in data.get('value', {}).get('timeSeries', []):
+                    site_codes = series.get('sourceInfo', {}).get('siteCode', [{}])
+                    lake_name = self._usgs_lakes.get(site_codes[0].get('value'))
+                    # Keep the first series per site, as the single-site fetch does
+                    if lake_name is None or lake_name in records:
+                        continue
+                    try:
+                        record = self._parse_usgs_series(lake_name, series)
+                    except (ValueError, TypeError, IndexError) as e:
+                        logger.warning("Failed to parse USGS data for %s: %s", lake_name, e)
+                        continue
+                    if record:
+                        records[lake_name] = record
+            
+        except Exception as e:
+            logger.warning("Failed to fetch USGS data for sites %s: %s", ','.join(site_ids), e)
+        
+        return records
+    
+    def _cache_usgs_sites(self, data: Dict):
+        """Cache a multi-site USGS response under each site's single-site URL"""
+        by_site: Dict[str, List[Dict]] = {}
+        for series in data.get('value', {}).get('timeSeries', []):
+            site_codes = series.get('sourceInfo', {}).get('siteCode', [{}])
+            site_id = site_codes[0].get('value')
+            if site_id:
+                by_site.setdefault(site_id, []).append(series)
+        
+        expires = time.monotonic() + USGS_CACHE_TTL
+        for site_id, series_list in by_site.items():
+            # Same shape as a single-site response, so fetch_usgs_temperature can read it
+            self._response_cache[USGS_IV_URL.format(site_id)] = (
+                expires, {'value': {'timeSeries': series_list}})
+    
     def fetch_noaa_temperature(self, lake_name: str) -> Optional[WaterTemperatureRecord]:
         """Fetch water temperature from NOAA buoy data"""
         buoy_id = self.noaa_buoys.get(lake_name)
@@ -158,134 +329,121 @@ class WaterTemperatureData:
         
         try:
             url = f"https://www.ndbc.noaa.gov/data/realtime2/{buoy_id}.txt"
-            response = requests.get(url, timeout=10)
+            match = self._cached(url, NOAA_CACHE_TTL, self._fetch_noaa_match)
             
-            if response.status_code == 200:
-                lines = response.text.strip().split('\n')
+            if match:
+                year, month, day, hour, minute = map(int, match.groups()[:5])
+                temp_celsius = float(match.group(6))
+                temp_fahrenheit = (temp_celsius * 9/5) + 32
+                
+                timestamp = datetime.datetime(year, month, day, hour, minute)
                 
-                # Find the latest data line (skip header lines)
-                for line in lines:
-                    if line.startswith('2025') or line.startswith('2024'):  # Data line
-                        parts = line.split()
-                        if len(parts) >= 15:
-                            # Parse NOAA format: YY MM DD hh mm WDIR WSPD GST WVHT DPD APD MWD PRES ATMP WTMP DEWP
-                            try:
-                                year = int(parts[0])
-                                month = int(parts[1])
-                                day = int(parts[2])
-                                hour = int(parts[3])
-                                minute = int(parts[4])
-                                
-                                # Water temperature is in column 14 (0-indexed)
-                                temp_celsius = float(parts[13])
-                                temp_fahrenheit = (temp_celsius * 9/5) + 32
-                                
-                                timestamp = datetime.datetime(year, month, day, hour, minute)
-                                
-                                return WaterTemperatureRecord(
-                                    lake_name=lake_name,
-                                    temperature_celsius=temp_celsius,
-                                    temperature_fahrenheit=temp_fahrenheit,
-                                    timestamp=timestamp,
-                                    source="NOAA Buoy",
-                                    notes=f"Buoy {buoy_id}"
-                                )
-                            except (ValueError, IndexError):
-                                continue
-                                break
+                return WaterTemperatureRecord(
+                    lake_name=lake_name,
+                    temperature_celsius=temp_celsius,
+                    temperature_fahrenheit=temp_fahrenheit,
+                    timestamp=timestamp,
+                    source="NOAA Buoy",
+                    notes=f"Buoy {buoy_id}"
+                )
             
         except Exception as e:
-            logger.warning(f"Failed to fetch NOAA data for {lake_name}: {e}")
+            logger.warning("Failed to fetch NOAA data for %s: %s", lake_name, e)
         
         return None
     
-    def estimate_temperature(self, lake_name: str, air_temperature: float, date: datetime.date) -> WaterTemperatureRecord:
-        """Estimate water temperature based on air temperature and seasonal patterns"""
-        
-        # Get lake characteristics
+    def _estimation_params(self, lake_name: str) -> Tuple[float, float, float, float, float]:
+        """Estimation coefficients for a lake:
+        (base_temp, seasonal_range, depth_factor, depth_cooling, avg_depth)"""
         lake_info = self.lake_characteristics.get(lake_name, {})
         max_depth = lake_info.get('max_depth', 50)
-        avg_depth = lake_info.get('avg_depth', 25)
-        
-        # Seasonal adjustment factors
-        day_of_year = date.timetuple().tm_yday
-        
-        # Seasonal temperature patterns for NH/VT lakes
-        # Peak water temp typically occurs in August (day ~220)
-        seasonal_factor = math.cos((day_of_year - 220) * 2 * math.pi / 365)
-        
-        # Lake-specific adjustments (more realistic for NH/VT lakes)
-        lake_adjustments = {
-            "Winnipesaukee": {"base_temp": 12, "seasonal_range": 10, "depth_factor": 0.8},  # Large, deep lake
-            "Newfound": {"base_temp": 11, "seasonal_range": 9, "depth_factor": 0.7},        # Deep, clear lake
-            "Squam": {"base_temp": 12, "seasonal_range": 10, "depth_factor": 0.8},          # Deep, clear lake
-            "Champlain": {"base_temp": 14, "seasonal_range": 11, "depth_factor": 0.9},      # Large lake
-            "Mascoma": {"base_temp": 13, "seasonal_range": 10, "depth_factor": 1.0},       # Smaller lake
-            "Sunapee": {"base_temp": 11, "seasonal_range": 9, "depth_factor": 0.7},        # Deep, clear lake
-            "First Connecticut": {"base_temp": 15, "seasonal_range": 12, "depth_factor": 1.1},  # River system
-        }
-        
-        lake_adj = lake_adjustments.get(lake_name, {"base_temp": 15, "seasonal_range": 12, "depth_factor": 0.8})
-        
-        # Calculate estimated water temperature
-        base_temp = lake_adj["base_temp"]
-        seasonal_range = lake_adj["seasonal_range"]
-        depth_factor = lake_adj["depth_factor"]
-        
-        # Seasonal component
-        seasonal_temp = base_temp + (seasonal_range * seasonal_factor * 0.5)
+        lake_adj = self.lake_adjustments.get(lake_name, self.default_adjustment)
         
-        # Air temperature influence (lagged and dampened)
-        air_influence = (air_temperature - 20) * 0.3 * depth_factor
-        
-        # Depth cooling effect
-        depth_cooling = (max_depth / 100) * 2  # Deeper lakes are cooler
-        
-        estimated_celsius = seasonal_temp + air_influence - depth_cooling
-        
-        # Clamp to reasonable range
-        estimated_celsius = max(0, min(30, estimated_celsius))
-        estimated_fahrenheit = (estimated_celsius * 9/5) + 32
+        # Depth cooling effect: deeper lakes are cooler
+        depth_cooling = (max_depth / 100) * 2
+        return (lake_adj["base_temp"], lake_adj["seasonal_range"], lake_adj["depth_factor"],
+                depth_cooling, lake_info.get('avg_depth', 25))
+    
+    def estimate_temperature(self, lake_name: str, air_temperature: float, date: datetime.date,
+                             timestamp: Optional[datetime.datetime] = None) -> WaterTemperatureRecord:
+        """Estimate water temperature based on air temperature and seasonal patterns"""
+        return self.estimate_temperatures([lake_name], [air_temperature], [date], timestamp)[0]
+    
+    def estimate_temperatures(self, lake_names: List[str], air_temperatures: List[float],
+                              dates: List[datetime.date],
+                              timestamp: Optional[datetime.datetime] = None) -> List[WaterTemperatureRecord]:
+        """Estimate water temperatures for parallel lists of lakes, air temperatures and dates"""
+        timestamp = timestamp or datetime.datetime.now()
+        estimate_params = self._estimate_params
+        records = []
+        
+        for lake_name, air_temperature, date in zip(lake_names, air_temperatures, dates):
+            params = estimate_params.get(lake_name) or self._estimation_params(lake_name)
+            base_temp, seasonal_range, depth_factor, depth_cooling, avg_depth = params
+            
+            # Seasonal temperature patterns for NH/VT lakes
+            seasonal_factor = _SEASONAL_FACTORS[date.timetuple().tm_yday]
+            
+            # Seasonal component
+            seasonal_temp = base_temp + (seasonal_range * seasonal_factor * 0.5)
+            
+            # Air temperature influence (lagged and dampened)
+            air_influence = (air_temperature - 20) * 0.3 * depth_factor
+            
+            estimated_celsius = seasonal_temp + air_influence - depth_cooling
+            
+            # Clamp to reasonable range
+            estimated_celsius = max(0, min(30, estimated_celsius))
+            estimated_fahrenheit = (estimated_celsius * 9/5) + 32
+            
+            records.append(WaterTemperatureRecord(
+                lake_name=lake_name,
+                temperature_celsius=estimated_celsius,
+                temperature_fahrenheit=estimated_fahrenheit,
+                timestamp=timestamp,
+                source="Estimation Model",
+                depth=avg_depth,
+                notes=f"Estimated based on air temp {air_temperature}°C, seasonal patterns, and lake characteristics"
+            ))
         
-        return WaterTemperatureRecord(
-            lake_name=lake_name,
-            temperature_celsius=estimated_celsius,
-            temperature_fahrenheit=estimated_fahrenheit,
-            timestamp=datetime.datetime.now(),
-            source="Estimation Model",
-            depth=avg_depth,
-            notes=f"Estimated based on air temp {air_temperature}°C, seasonal patterns, and lake characteristics"
-        )
+        return records
     
     def save_temperature_record(self, record: WaterTemperatureRecord) -> bool:
         """Save temperature record to database"""
+        return self.save_temperature_records([record]) == 1
+    
+    def save_temperature_records(self, records: List[WaterTemperatureRecord]) -> int:
+        """Save temperature records to database in one transaction"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO water_temperature_records 
-                (lake_name, temperature_celsius, temperature_fahrenheit, timestamp, source, latitude, longitude, depth, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record.lake_name,
-                record.temperature_celsius,
-                record.temperature_fahrenheit,
-                record.timestamp.isoformat(),
-                record.source,
-                record.latitude,
-                record.longitude,
-                record.depth,
-                record.notes
-            ))
+            with self._lock, self.conn:
+                self.conn.executemany('''
+                    INSERT INTO water_temperature_records 
+                    (lake_name, temperature_celsius, temperature_fahrenheit, timestamp, source, latitude, longitude, depth, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(lake_name, source, timestamp) DO UPDATE SET
+                        temperature_celsius = excluded.temperature_celsius,
+                        temperature_fahrenheit = excluded.temperature_fahrenheit,
+                        latitude = excluded.latitude,
+                        longitude = excluded.longitude,
+                        depth = excluded.depth,
+                        notes = excluded.notes
+                ''', [(
+                    record.lake_name,
+                    record.temperature_celsius,
+                    record.temperature_fahrenheit,
+                    record.timestamp.isoformat(),
+                    record.source,
+                    record.latitude,
+                    record.longitude,
+                    record.depth,
+                    record.notes
+                ) for record in records])
             
-            conn.commit()
-            conn.close()
-            return True
+            return len(records)
             
         except Exception as e:
-            logger.error(f"Failed to save temperature record: {e}")
-            return False
+            logger.error("Failed to save temperature records: %s", e)
+            return 0
     
     def update_water_temperatures(self, air_temperatures: Dict[str, float] = None) -> Dict:
         """Update water temperature data for all lakes"""
@@ -303,29 +461,40 @@ class WaterTemperatureData:
                 "First Connecticut": 23.0, # ~73°F
             }
         
-        records_updated = 0
+        records = []
         sources_used = []
-        
-        for lake_name in self.usgs_sites.keys():
-            record = None
-            
-            # Try USGS first
-            record = self.fetch_usgs_temperature(lake_name)
+        now = datetime.datetime.now()
+        today = now.date()
+        
+        # One multi-site USGS request alongside the NOAA buoy fetches, then
+        # pick by priority
+        lake_names = list(self.usgs_sites.keys())
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            usgs_future = executor.submit(self.fetch_usgs_temperatures, lake_names)
+            noaa_results = list(executor.map(self.fetch_noaa_temperature, lake_names))
+            usgs_records = usgs_future.result()
+        
+        for lake_name, noaa_record in zip(lake_names, noaa_results):
+            # Prefer USGS, then NOAA buoy; None marks a lake left to estimate
+            record = usgs_records.get(lake_name)
             if record:
                 sources_used.append("USGS")
             else:
-                # Try NOAA buoy
-                record = self.fetch_noaa_temperature(lake_name)
+                record = noaa_record
                 if record:
                     sources_used.append("NOAA")
                 else:
-                    # Use estimation model
-                    air_temp = air_temperatures.get(lake_name, 25.0)  # Default to 25°C (~77°F)
-                    record = self.estimate_temperature(lake_name, air_temp, datetime.date.today())
                     sources_used.append("Estimation")
-            
-            if record and self.save_temperature_record(record):
-                records_updated += 1
+            records.append(record)
+        
+        # Use estimation model for the remaining lakes in one pass
+        missing = [name for name, record in zip(lake_names, records) if record is None]
+        if missing:
+            air_temps = [air_temperatures.get(name, 25.0) for name in missing]  # Default to 25°C (~77°F)
+            estimates = iter(self.estimate_temperatures(missing, air_temps, [today] * len(missing), now))
+            records = [record or next(estimates) for record in records]
+        
+        records_updated = self.save_temperature_records(records)
         
         # Log update
         self.log_update("temperature_update", records_updated, True)
@@ -338,38 +507,32 @@ class WaterTemperatureData:
     
     def log_update(self, update_type: str, records_updated: int, success: bool = True, error_message: str = None):
         """Log update activity"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO temperature_update_log (update_type, records_updated, success, error_message)
-            VALUES (?, ?, ?, ?)
-        ''', (update_type, records_updated, success, error_message))
-        
-        conn.commit()
-        conn.close()
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO temperature_update_log (update_type, records_updated, success, error_message)
+                VALUES (?, ?, ?, ?)
+            ''', (update_type, records_updated, success, error_message))
     
     def get_water_temperatures(self, lake_name: str = None, days_back: int = 7) -> List[Dict]:
         """Get water temperature data from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if lake_name:
-            cursor.execute('''
-                SELECT * FROM water_temperature_records 
-                WHERE lake_name = ? 
-                AND timestamp >= datetime('now', '-{} days')
-                ORDER BY timestamp DESC
-            '''.format(days_back), (lake_name,))
-        else:
-            cursor.execute('''
-                SELECT * FROM water_temperature_records 
-                WHERE timestamp >= datetime('now', '-{} days')
-                ORDER BY timestamp DESC
-            '''.format(days_back))
-        
-        records = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            
+            if lake_name:
+                cursor.execute('''
+                    SELECT * FROM water_temperature_records 
+                    WHERE lake_name = ? 
+                    AND timestamp >= datetime('now', ?)
+                    ORDER BY timestamp DESC
+                ''', (lake_name, f'-{int(days_back)} days'))
+            else:
+                cursor.execute('''
+                    SELECT * FROM water_temperature_records 
+                    WHERE timestamp >= datetime('now', ?)
+                    ORDER BY timestamp DESC
+                ''', (f'-{int(days_back)} days',))
+            
+            records = cursor.fetchall()
         
         # Convert to dictionary format
         result = []
@@ -392,22 +555,17 @@ class WaterTemperatureData:
     
     def get_latest_temperatures(self) -> Dict[str, Dict]:
         """Get latest water temperature for each lake"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT lake_name, temperature_celsius, temperature_fahrenheit, timestamp, source
-            FROM water_temperature_records 
-            WHERE id IN (
-                SELECT MAX(id) 
+        with self._lock:
+            records = self.conn.execute('''
+                SELECT lake_name, temperature_celsius, temperature_fahrenheit, timestamp, source
                 FROM water_temperature_records 
-                GROUP BY lake_name
-            )
-            ORDER BY lake_name
-        ''')
-        
-        records = cursor.fetchall()
-        conn.close()
+                WHERE id IN (
+                    SELECT MAX(id)
+                    FROM water_temperature_records 
+                    GROUP BY lake_name
+                )
+                ORDER BY lake_name
+            ''').fetchall()
         
         result = {}
         for record in records:
@@ -425,22 +583,21 @@ def main():
     """Test the water temperature module"""
     logging.basicConfig(level=logging.INFO)
     
-    water_temp = WaterTemperatureData()
-    
-    # Test USGS data
-    usgs_record = water_temp.fetch_usgs_temperature("Champlain")
-    
-    # Test NOAA data
-    noaa_record = water_temp.fetch_noaa_temperature("Champlain")
-    
-    # Test estimation
-    estimated = water_temp.estimate_temperature("Winnipesaukee", 22.0, datetime.date.today())
-    
-    # Update all temperatures
-    result = water_temp.update_water_temperatures()
-    
-    # Get latest temperatures
-    latest = water_temp.get_latest_temperatures()
+    with WaterTemperatureData() as water_temp:
+        # Test USGS data
+        usgs_record = water_temp.fetch_usgs_temperature("Champlain")
+        
+        # Test NOAA data
+        noaa_record = water_temp.fetch_noaa_temperature("Champlain")
+        
+        # Test estimation
+        estimated = water_temp.estimate_temperature("Winnipesaukee", 22.0, datetime.date.today())
+        
+        # Update all temperatures
+        result = water_temp.update_water_temperatures()
+        
+        # Get latest temperatures
+        latest = water_temp.get_latest_temperatures()
 
 if __name__ == "__main__":
     main()
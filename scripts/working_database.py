@@ -4,25 +4,214 @@ Working SQLite Database for Fishing Weather Data
 Matches existing database schema
 """
 
+import atexit
 import sqlite3
+import threading
+import time
 import datetime
+import itertools
 import logging
-from typing import Dict, List, Any, Optional
+import queue
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+import db_connection
+from metrics import metrics_snapshot, progress_point
 
 logger = logging.getLogger(__name__)
 
+# Seconds cached read results stay fresh (writes through this object clear them)
+STATISTICS_CACHE_TTL = 60
+CONDITIONS_CACHE_TTL = 300
+
+WEATHER_UNIQUE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_weather_loc_ts
+    ON weather_data(location, date_ts DESC)
+"""
+
+# SQL lives in fixed strings (no per-call formatting) so every execute hits
+# the connection's prepared-statement cache
+_WEATHER_INSERT = """
+    INSERT INTO weather_data (
+        location, date_ts, date_str, sunrise, summary,
+        temp_day, pressure, wind_speed, wind_gust, 
+        fishing_base, fishing_rating
+    ) VALUES """
+_WEATHER_ROW_PLACEHOLDERS = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_WEATHER_ON_CONFLICT = """
+    ON CONFLICT(location, date_ts) DO UPDATE SET
+        date_str = excluded.date_str,
+        sunrise = excluded.sunrise,
+        summary = excluded.summary,
+        temp_day = excluded.temp_day,
+        pressure = excluded.pressure,
+        wind_speed = excluded.wind_speed,
+        wind_gust = excluded.wind_gust,
+        fishing_base = excluded.fishing_base,
+        fishing_rating = excluded.fishing_rating
+"""
+WEATHER_UPSERT_SQL = _WEATHER_INSERT + _WEATHER_ROW_PLACEHOLDERS + _WEATHER_ON_CONFLICT
+
+# Rows per multi-row VALUES upsert; 50 x 11 columns stays under the 999-variable
+# limit of older SQLite builds
+UPSERT_BATCH_ROWS = 50
+WEATHER_UPSERT_MANY_SQL = (_WEATHER_INSERT
+                           + ", ".join([_WEATHER_ROW_PLACEHOLDERS] * UPSERT_BATCH_ROWS)
+                           + _WEATHER_ON_CONFLICT)
+
+# Epoch seconds for 'now' shifted by a bound modifier such as '-30 days',
+# evaluated once per statement by SQLite
+CUTOFF_TS_SQL = "CAST(strftime('%s', 'now', ?) AS INTEGER)"
+
+STATISTICS_SQL = """
+    SELECT location, cnt,
+           (SELECT MIN(date_ts) FROM weather_data),
+           (SELECT MAX(date_ts) FROM weather_data)
+    FROM weather_stats
+    WHERE cnt > 0
+    ORDER BY location
+"""
+
+# get_fishing_conditions queries. The per-location form leads with the
+# equality so it reads as the (location, date_ts) seek idx_weather_loc_ts serves
+CONDITIONS_KEYS = ('location', 'date_str', 'fishing_base', 'wind_speed', 'wind_gust',
+                   'temperature', 'pressure')
+_CONDITIONS_COLUMNS = """
+    SELECT location, date_str, fishing_base, wind_speed, wind_gust, 
+           temp_day as temperature, pressure
+    FROM weather_data
+"""
+CONDITIONS_SQL = _CONDITIONS_COLUMNS + f"""
+    WHERE date_ts >= {CUTOFF_TS_SQL}
+    ORDER BY date_ts DESC
+"""
+CONDITIONS_BY_LOCATION_SQL = _CONDITIONS_COLUMNS + f"""
+    WHERE location = ? AND date_ts >= {CUTOFF_TS_SQL}
+    ORDER BY date_ts DESC
+"""
+
+# Rows pulled from SQLite per fetchmany() by the iter_* methods
+FETCH_CHUNK_SIZE = 1000
+
+# Idle read-only connections kept for the iter_* methods
+READ_POOL_SIZE = 4
+
+# Cleanup job fields stored in cleanup_jobs, in SELECT order
+CLEANUP_JOB_KEYS = ('job_id', 'status', 'days_to_keep', 'deleted_records', 'error')
+CLEANUP_JOB_SQL = f"SELECT {', '.join(CLEANUP_JOB_KEYS)} FROM cleanup_jobs WHERE job_id = ?"
+
+# Columns returned by get_weather_data, in table order
+WEATHER_COLUMNS = ('id', 'location', 'date_ts', 'date_str', 'sunrise', 'summary', 'temp_day',
+                   'pressure', 'wind_speed', 'wind_gust', 'fishing_base', 'fishing_rating',
+                   'created_at')
+DATE_TS_INDEX = WEATHER_COLUMNS.index('date_ts')
+
+def _weather_query(location: bool, start: bool, end: bool) -> str:
+    """Build the get_weather_data query for one combination of filters"""
+    query = f"SELECT {', '.join(WEATHER_COLUMNS)} FROM weather_data WHERE 1=1"
+    if location:
+        query += " AND location = ?"
+    if start:
+        query += " AND date_ts >= ?"
+    if end:
+        query += " AND date_ts <= ?"
+    return query + " ORDER BY date_ts DESC LIMIT ?"
+
+# Every get_weather_data variant, built once so each call reuses the same
+# statement text (and so the same cached prepared statement)
+WEATHER_QUERIES = {
+    (location, start, end): _weather_query(location, start, end)
+    for location in (False, True) for start in (False, True) for end in (False, True)
+}
+
+def _epoch_seconds(value) -> int:
+    """date_ts bound for a datetime, a date (local midnight) or epoch seconds"""
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return int(datetime.datetime.combine(value, datetime.time.min).timestamp())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    raise TypeError(f"expected a datetime, date or epoch seconds, got {type(value).__name__}")
+
 class WorkingWeatherDatabase:
     def __init__(self, db_path: str = "sqlite_db/weather_data.db"):
         """Initialize SQLite database for weather data"""
         self.db_path = db_path
+        
+        # One connection for the object's lifetime, serialized by a lock
+        # (re-entrant so store_weather_data can run inside bulk_session)
+        self._lock = threading.RLock()
+        self._conn = db_connection.connect(self.db_path)
+        self._in_bulk = False
+        
+        # The iter_* generators read on their own connections, so a paused or
+        # abandoned generator never holds self._lock or the shared connection
+        self._readers = queue.LifoQueue()
+        
+        # get_statistics / get_fishing_conditions results, dropped on every write
+        self._query_cache: Dict[tuple, Tuple[float, Any]] = {}
+        # Bumped by every _invalidate, so a fetch that overlapped a write is not cached
+        self._cache_generation = 0
+        atexit.register(self.close)
+        
         self._create_tables()
     
+    def close(self):
+        """Close the database connection"""
+        atexit.unregister(self.close)
+        with self._lock:
+            # Detach first so the instance counts as closed even if closing
+            # raises; a with-block exit followed by the atexit hook lands here twice
+            conn, self._conn = self._conn, None
+            if conn is None:
+                return
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            db_connection.close(conn)
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The shared connection; sqlite3.ProgrammingError once closed"""
+        return db_connection.require_open(self._conn)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool, opening one if none is idle"""
+        db_connection.require_open(self._conn)
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = db_connection.connect(self.db_path)
+            conn.execute("PRAGMA query_only=1")
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                if self._conn is None or self._readers.qsize() >= READ_POOL_SIZE:
+                    conn.close()
+                else:
+                    self._readers.put(conn)
+    
     def _create_tables(self):
         """Create database tables if they don't exist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self.conn as conn:
                 cursor = conn.cursor()
                 
+                # WAL is persistent, so it only needs setting once per database
+                cursor.execute("PRAGMA journal_mode=WAL")
+                
+                # One write transaction for the whole setup, so another process
+                # starting up cannot interleave with the weather_stats existence
+                # check, its backfill and the trigger creation
+                cursor.execute("BEGIN IMMEDIATE")
+                
                 # Create weather_data table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS weather_data (
@@ -42,214 +231,438 @@ class WorkingWeatherDatabase:
                     )
                 """)
                 
+                # Index for date_ts range scans (forecast window, cleanup)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_weather_date_ts
+                    ON weather_data(date_ts DESC)
+                """)
+                
+                # One row per location and time: serves per-location date_ts
+                # range scans and is the conflict target for the upsert
+                try:
+                    cursor.execute(WEATHER_UNIQUE_INDEX_SQL)
+                except sqlite3.IntegrityError:
+                    # Older databases hold duplicate rows; keep the newest copy
+                    cursor.execute("""
+                        DELETE FROM weather_data
+                        WHERE id NOT IN (
+                            SELECT MAX(id) FROM weather_data GROUP BY location, date_ts
+                        )
+                    """)
+                    cursor.execute(WEATHER_UNIQUE_INDEX_SQL)
+                
+                # Per-location row counts kept current by triggers, so
+                # get_statistics never has to COUNT the whole table
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'weather_stats'")
+                stats_exist = cursor.fetchone() is not None
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS weather_stats (
+                        location TEXT PRIMARY KEY,
+                        cnt INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                if not stats_exist:
+                    cursor.execute("""
+                        INSERT INTO weather_stats (location, cnt)
+                        SELECT location, COUNT(*) FROM weather_data GROUP BY location
+                    """)
+                
+                # Upserts that hit an existing row fire the UPDATE trigger, not INSERT
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_weather_stats_insert
+                    AFTER INSERT ON weather_data
+                    BEGIN
+                        INSERT INTO weather_stats (location, cnt) VALUES (NEW.location, 1)
+                        ON CONFLICT(location) DO UPDATE SET cnt = cnt + 1;
+                    END
+                """)
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_weather_stats_delete
+                    AFTER DELETE ON weather_data
+                    BEGIN
+                        UPDATE weather_stats SET cnt = cnt - 1 WHERE location = OLD.location;
+                    END
+                """)
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS trg_weather_stats_move
+                    AFTER UPDATE OF location ON weather_data
+                    WHEN NEW.location IS NOT OLD.location
+                    BEGIN
+                        UPDATE weather_stats SET cnt = cnt - 1 WHERE location = OLD.location;
+                        INSERT INTO weather_stats (location, cnt) VALUES (NEW.location, 1)
+                        ON CONFLICT(location) DO UPDATE SET cnt = cnt + 1;
+                    END
+                """)
+                
+                # Background cleanup jobs, visible to every API worker process
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS cleanup_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        days_to_keep INTEGER NOT NULL,
+                        deleted_records INTEGER,
+                        error TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cursor.execute("PRAGMA table_info(cleanup_jobs)")
+                if 'error' not in {column[1] for column in cursor.fetchall()}:
+                    cursor.execute("ALTER TABLE cleanup_jobs ADD COLUMN error TEXT")
+                
                 conn.commit()
                 logger.info("Weather database tables initialized")
                 
-        except Exception as e:
-            logger.error(f"Error creating database tables: {e}")
+        except sqlite3.Error as e:
+            logger.error("Error creating database tables: %s", e)
     
     def store_weather_data(self, weather_records: List[Dict[str, Any]]) -> bool:
         """Store weather data in the database"""
+        rows = []
+        for record in weather_records:
+            # date_ts is stored as epoch seconds; accept datetimes too
+            date_ts = record.get('date_ts')
+            if isinstance(date_ts, datetime.datetime):
+                date_ts = int(date_ts.timestamp())
+            
+            # Map current data structure to database schema
+            rows.append((
+                record.get('location'),
+                date_ts,
+                record.get('date_str'),
+                record.get('sunrise'),
+                record.get('summary'),
+                record.get('temp'),  # Map 'temp' to 'temp_day'
+                record.get('pressure'),
+                record.get('wind_speed'),
+                record.get('wind_gust'),
+                record.get('fishing_base'),
+                record.get('fishing_base')  # Use fishing_base for fishing_rating too
+            ))
+        
+        return self.store_weather_rows(rows)
+    
+    def store_weather_rows(self, rows: Iterable[Tuple]) -> bool:
+        """Store tuples in WEATHER_UPSERT_SQL column order, e.g. a backfill generator"""
+        # Closed instances raise instead of taking the logged-default path
+        db_connection.require_open(self._conn)
+        in_bulk = False
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for record in weather_records:
-                    # Map current data structure to database schema
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO weather_data (
-                            location, date_ts, date_str, sunrise, summary,
-                            temp_day, pressure, wind_speed, wind_gust, 
-                            fishing_base, fishing_rating
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        record.get('location'),
-                        int(record.get('date_ts').timestamp()) if record.get('date_ts') else None,
-                        record.get('date_str'),
-                        record.get('sunrise'),
-                        record.get('summary'),
-                        record.get('temp'),  # Map 'temp' to 'temp_day'
-                        record.get('pressure'),
-                        record.get('wind_speed'),
-                        record.get('wind_gust'),
-                        record.get('fishing_base'),
-                        record.get('fishing_base')  # Use fishing_base for fishing_rating too
-                    ))
-                
-                conn.commit()
-                logger.info(f"Stored {len(weather_records)} weather records")
+            with progress_point('weather.store'), self._lock:
+                # Read once under the lock: by the except below the lock is
+                # released and another thread may have opened a bulk_session
+                in_bulk = self._in_bulk
+                if in_bulk:
+                    # bulk_session owns the transaction and commits it on exit
+                    stored = self._upsert_rows(self.conn.cursor(), rows)
+                else:
+                    with self.conn as conn:
+                        cursor = conn.cursor()
+                        
+                        # Take the write lock up front and insert the batch in one transaction
+                        cursor.execute("BEGIN IMMEDIATE")
+                        stored = self._upsert_rows(cursor, rows)
+                        
+                        conn.commit()
+                    self._invalidate()
+                logger.info("Stored %s weather records", stored)
                 return True
                 
-        except Exception as e:
-            logger.error(f"Error storing weather data: {e}")
+        except sqlite3.Error as e:
+            if in_bulk:
+                # Let bulk_session roll back the whole session
+                raise
+            logger.error("Error storing weather data: %s", e)
             return False
     
+    @staticmethod
+    def _upsert_rows(cursor: sqlite3.Cursor, rows: Iterable[Tuple]) -> int:
+        """Upsert rows in multi-row VALUES chunks, finishing the tail row by row"""
+        stored = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, UPSERT_BATCH_ROWS))
+            if len(chunk) < UPSERT_BATCH_ROWS:
+                break
+            cursor.execute(WEATHER_UPSERT_MANY_SQL, list(itertools.chain.from_iterable(chunk)))
+            stored += cursor.rowcount
+        if chunk:
+            cursor.executemany(WEATHER_UPSERT_SQL, chunk)
+            stored += cursor.rowcount
+        return stored
+    
+    @contextmanager
+    def bulk_session(self):
+        """Run several store_weather_data calls in one transaction, committed on exit"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._in_bulk = True
+            try:
+                yield self
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self._in_bulk = False
+                self._invalidate()
+    
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Commit the enclosed writes and drop cached reads, unless bulk_session owns the transaction"""
+        with self._lock:
+            if self._in_bulk:
+                # bulk_session commits (or rolls back) everything on exit
+                yield self.conn
+                return
+            with self.conn as conn:
+                yield conn
+            self._invalidate()
+    
     def get_weather_data(self, location: Optional[str] = None, 
                         start_date: Optional[datetime.datetime] = None,
                         end_date: Optional[datetime.datetime] = None,
                         limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve weather data from database"""
+        db_connection.require_open(self._conn)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                query = "SELECT * FROM weather_data WHERE 1=1"
-                params = []
-                
-                if location:
-                    query += " AND location = ?"
-                    params.append(location)
-                
-                if start_date:
-                    query += " AND date_ts >= ?"
-                    params.append(int(start_date.timestamp()))
-                
-                if end_date:
-                    query += " AND date_ts <= ?"
-                    params.append(int(end_date.timestamp()))
-                
-                query += " ORDER BY date_ts DESC LIMIT ?"
-                params.append(limit)
-                
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
+            return list(self.iter_weather_data(location, start_date, end_date, limit))
                 
-                # Convert to list of dictionaries
-                result = []
-                for row in rows:
-                    row_dict = dict(row)
-                    # Convert timestamps back to datetime objects
-                    if row_dict.get('date_ts'):
-                        row_dict['date_ts'] = datetime.datetime.fromtimestamp(row_dict['date_ts'])
-                    result.append(row_dict)
-                
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error retrieving weather data: {e}")
+        except sqlite3.Error as e:
+            logger.error("Error retrieving weather data: %s", e)
             return []
     
+    def iter_weather_data(self, location: Optional[str] = None, 
+                          start_date: Optional[datetime.datetime] = None,
+                          end_date: Optional[datetime.datetime] = None,
+                          limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield weather data rows in fetchmany chunks from a pooled read connection"""
+        params = []
+        
+        if location:
+            params.append(location)
+        
+        # Convert (or reject) the bounds before any connection is borrowed
+        if start_date is not None:
+            params.append(_epoch_seconds(start_date))
+        
+        if end_date is not None:
+            params.append(_epoch_seconds(end_date))
+        
+        params.append(limit)
+        
+        query = WEATHER_QUERIES[bool(location), start_date is not None, end_date is not None]
+        
+        with self._reader() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                fromtimestamp = datetime.datetime.fromtimestamp
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        row_dict = dict(zip(WEATHER_COLUMNS, row))
+                        # Convert timestamps back to datetime objects
+                        date_ts = row[DATE_TS_INDEX]
+                        if date_ts:
+                            row_dict['date_ts'] = fromtimestamp(date_ts)
+                        yield row_dict
+            finally:
+                cursor.close()
+    
+    def _invalidate(self):
+        """Drop cached reads, and stop in-flight fetches from storing their results"""
+        with self._lock:
+            self._query_cache.clear()
+            self._cache_generation += 1
+    
+    def _cached(self, key: tuple, ttl: float, fetch):
+        """Return fetch(), reusing its result for ttl seconds or until the next write"""
+        with self._lock:
+            now = time.monotonic()
+            cached = self._query_cache.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+            generation = self._cache_generation
+        
+        # Fetched outside the lock so a slow read never blocks writers; a write
+        # that lands meanwhile bumps the generation and the result goes uncached
+        result = fetch()
+        with self._lock:
+            if self._cache_generation == generation:
+                self._query_cache[key] = (now + ttl, result)
+        return result
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
+        db_connection.require_open(self._conn)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Total records
-                cursor.execute("SELECT COUNT(*) FROM weather_data")
-                total_records = cursor.fetchone()[0]
-                
-                # Records by location
-                cursor.execute("SELECT location, COUNT(*) FROM weather_data GROUP BY location")
-                location_counts = dict(cursor.fetchall())
-                
-                # Date range
-                cursor.execute("SELECT MIN(date_ts), MAX(date_ts) FROM weather_data")
-                min_date, max_date = cursor.fetchone()
-                
-                return {
-                    'total_records': total_records,
-                    'location_counts': location_counts,
-                    'date_range': {
-                        'start': datetime.datetime.fromtimestamp(min_date) if min_date else None,
-                        'end': datetime.datetime.fromtimestamp(max_date) if max_date else None
-                    }
-                }
-                
-        except Exception as e:
-            logger.error(f"Error getting statistics: {e}")
+            statistics = self._cached(('statistics',), STATISTICS_CACHE_TTL, self._read_statistics)
+            # Copy the nested dicts too, so callers cannot edit the cached entry
+            return {**statistics,
+                    'location_counts': dict(statistics['location_counts']),
+                    'date_range': dict(statistics['date_range']),
+                    'metrics': metrics_snapshot()}
+                
+        except sqlite3.Error as e:
+            logger.error("Error getting statistics: %s", e)
             return {}
+    
+    def _read_statistics(self) -> Dict[str, Any]:
+        """Query the record counts and date range behind get_statistics"""
+        # Plain cursor: leaving a connection context manager would commit an
+        # open bulk_session
+        with self._lock:
+            cursor = self.conn.cursor()
+            
+            # Records by location from the trigger-maintained counts, with the
+            # date range (each end a single idx_weather_date_ts lookup) on every row
+            cursor.execute(STATISTICS_SQL)
+            rows = cursor.fetchall()
+            location_counts = {location: cnt for location, cnt, _, _ in rows}
+            min_date, max_date = rows[0][2:] if rows else (None, None)
+            
+            return {
+                'total_records': sum(location_counts.values()),
+                'location_counts': location_counts,
+                'date_range': {
+                    'start': datetime.datetime.fromtimestamp(min_date) if min_date else None,
+                    'end': datetime.datetime.fromtimestamp(max_date) if max_date else None
+                }
+            }
 
     def get_fishing_conditions(self, location: Optional[str] = None, 
                              days_back: int = 30) -> List[Dict[str, Any]]:
         """Get fishing conditions history"""
+        db_connection.require_open(self._conn)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT location, date_str, fishing_base, wind_speed, wind_gust, 
-                           temp_day as temperature, pressure
-                    FROM weather_data 
-                    WHERE date_ts >= ?
-                """
-                params = [int((datetime.datetime.now() - datetime.timedelta(days=days_back)).timestamp())]
-                
-                if location:
-                    query += " AND location = ?"
-                    params.append(location)
-                
-                query += " ORDER BY date_ts DESC"
+            conditions = self._cached(('fishing_conditions', location, days_back), CONDITIONS_CACHE_TTL,
+                                      lambda: list(self.iter_fishing_conditions(location, days_back)))
+            # Fresh row dicts per call, so callers cannot edit the cached entry
+            return [dict(row) for row in conditions]
                 
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                return [dict(row) for row in rows]
-                
-        except Exception as e:
-            logger.error(f"Error retrieving fishing conditions: {e}")
+        except sqlite3.Error as e:
+            logger.error("Error retrieving fishing conditions: %s", e)
             return []
+    
+    def iter_fishing_conditions(self, location: Optional[str] = None,
+                                days_back: int = 30) -> Iterator[Dict[str, Any]]:
+        """Yield fishing conditions rows in fetchmany chunks from a pooled read connection"""
+        cutoff = f'-{int(days_back)} days'
+        if location:
+            query, params = CONDITIONS_BY_LOCATION_SQL, (location, cutoff)
+        else:
+            query, params = CONDITIONS_SQL, (cutoff,)
+        
+        with self._reader() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(zip(CONDITIONS_KEYS, row))
+            finally:
+                cursor.close()
 
     def cleanup_old_data(self, days_to_keep: int = 30) -> int:
-        """Remove weather data older than specified days"""
+        """Remove weather data older than specified days (logs and re-raises SQLite errors)"""
         try:
-            cutoff_timestamp = int((datetime.datetime.now() - datetime.timedelta(days=days_to_keep)).timestamp())
+            with self._write() as conn:
+                # Delete old records; rowcount says how many went
+                cursor = conn.execute("DELETE FROM weather_data WHERE date_ts < " + CUTOFF_TS_SQL,
+                                      (f'-{int(days_to_keep)} days',))
+                records_deleted = cursor.rowcount
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Count records to be deleted
-                cursor.execute("SELECT COUNT(*) FROM weather_data WHERE date_ts < ?", (cutoff_timestamp,))
-                records_to_delete = cursor.fetchone()[0]
-                
-                if records_to_delete > 0:
-                    # Delete old records
-                    cursor.execute("DELETE FROM weather_data WHERE date_ts < ?", (cutoff_timestamp,))
-                    conn.commit()
+            if records_deleted > 0:
+                logger.info("Cleaned up %s weather records older than %s days", records_deleted, days_to_keep)
+                return records_deleted
+            else:
+                logger.info("No weather records older than %s days to clean up", days_to_keep)
+                return 0
                     
-                    logger.info(f"Cleaned up {records_to_delete} weather records older than {days_to_keep} days")
-                    return records_to_delete
-                else:
-                    logger.info(f"No weather records older than {days_to_keep} days to clean up")
-                    return 0
-                    
-        except Exception as e:
-            logger.error(f"Error cleaning up old weather data: {e}")
-            return 0
+        except sqlite3.Error as e:
+            # Callers (and bulk_session) need to know the delete did not happen
+            logger.error("Error cleaning up old weather data: %s", e)
+            raise
 
     def get_cleanup_statistics(self) -> Dict[str, Any]:
         """Get statistics about data that could be cleaned up"""
+        db_connection.require_open(self._conn)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Count records older than 30 days
-                cutoff_30 = int((datetime.datetime.now() - datetime.timedelta(days=30)).timestamp())
-                cursor.execute("SELECT COUNT(*) FROM weather_data WHERE date_ts < ?", (cutoff_30,))
-                older_than_30 = cursor.fetchone()[0]
-                
-                # Count records older than 60 days
-                cutoff_60 = int((datetime.datetime.now() - datetime.timedelta(days=60)).timestamp())
-                cursor.execute("SELECT COUNT(*) FROM weather_data WHERE date_ts < ?", (cutoff_60,))
-                older_than_60 = cursor.fetchone()[0]
-                
-                # Count records older than 90 days
-                cutoff_90 = int((datetime.datetime.now() - datetime.timedelta(days=90)).timestamp())
-                cursor.execute("SELECT COUNT(*) FROM weather_data WHERE date_ts < ?", (cutoff_90,))
-                older_than_90 = cursor.fetchone()[0]
+            with self._lock:
+                cursor = self.conn.cursor()
+                
+                # Count every age bracket and the total in a single pass
+                cursor.execute(f"""
+                    SELECT COALESCE(SUM(date_ts < {CUTOFF_TS_SQL}), 0),
+                           COALESCE(SUM(date_ts < {CUTOFF_TS_SQL}), 0),
+                           COALESCE(SUM(date_ts < {CUTOFF_TS_SQL}), 0),
+                           COUNT(*)
+                    FROM weather_data
+                """, ('-30 days', '-60 days', '-90 days'))
+                older_than_30, older_than_60, older_than_90, total_records = cursor.fetchone()
                 
                 return {
                     'older_than_30_days': older_than_30,
                     'older_than_60_days': older_than_60,
                     'older_than_90_days': older_than_90,
-                    'total_records': self.get_statistics().get('total_records', 0)
+                    'total_records': total_records
                 }
                 
-        except Exception as e:
-            logger.error(f"Error getting cleanup statistics: {e}")
+        except sqlite3.Error as e:
+            logger.error("Error getting cleanup statistics: %s", e)
             return {}
+    
+    def add_cleanup_job(self, job_id: str, days_to_keep: int, keep: int) -> Optional[Dict[str, Any]]:
+        """Record a queued cleanup job, forgetting all but the newest keep jobs"""
+        db_connection.require_open(self._conn)
+        try:
+            with self._write() as conn:
+                conn.execute(
+                    "INSERT INTO cleanup_jobs (job_id, status, days_to_keep) VALUES (?, 'queued', ?)",
+                    (job_id, days_to_keep))
+                conn.execute("""
+                    DELETE FROM cleanup_jobs WHERE rowid NOT IN (
+                        SELECT rowid FROM cleanup_jobs ORDER BY rowid DESC LIMIT ?
+                    )
+                """, (keep,))
+            return dict(zip(CLEANUP_JOB_KEYS, (job_id, 'queued', days_to_keep, None, None)))
+        
+        except sqlite3.Error as e:
+            logger.error("Error recording cleanup job: %s", e)
+            return None
+    
+    def update_cleanup_job(self, job_id: str, status: str,
+                           deleted_records: Optional[int] = None,
+                           error: Optional[str] = None) -> bool:
+        """Set the status (and deleted count or error, once known) of a cleanup job"""
+        db_connection.require_open(self._conn)
+        try:
+            with self._write() as conn:
+                conn.execute(
+                    "UPDATE cleanup_jobs SET status = ?, deleted_records = ?, error = ? WHERE job_id = ?",
+                    (status, deleted_records, error, job_id))
+            return True
+        
+        except sqlite3.Error as e:
+            logger.error("Error updating cleanup job: %s", e)
+            return False
+    
+    def get_cleanup_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a cleanup job by id, or None if it is unknown"""
+        db_connection.require_open(self._conn)
+        try:
+            with self._lock:
+                row = self.conn.execute(CLEANUP_JOB_SQL, (job_id,)).fetchone()
+            return dict(zip(CLEANUP_JOB_KEYS, row)) if row else None
+        
+        except sqlite3.Error as e:
+            logger.error("Error retrieving cleanup job: %s", e)
+            return None
 
 if __name__ == '__main__':
     # Example usage
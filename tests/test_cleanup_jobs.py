@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the /api/cleanup job tracking in app.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import app
+from working_database import WorkingWeatherDatabase
+
+class CleanupJobTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+        # Point the app at a scratch database and skip its first-request cleanup
+        for name, value in (('_weather_db', self.db), ('_startup_cleanup_started', True)):
+            patcher = mock.patch.object(app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = app.app.test_client()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_failed_cleanup_is_reported_as_failed(self):
+        job = self.db.add_cleanup_job('job1', 30, keep=app.MAX_TRACKED_CLEANUP_JOBS)
+        # Make the DELETE itself fail, the way a broken or foreign database would
+        with self.db._lock:
+            self.db.conn.execute("DROP TABLE weather_data")
+            self.db.conn.commit()
+        app._run_cleanup_job(job['job_id'], 30)
+
+        response = self.client.get(f"/api/cleanup/stats?job_id={job['job_id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['job']['status'], 'failed')
+        self.assertIn('no such table', response.json['job']['error'])
+        self.assertIsNone(response.json['job']['deleted_records'])
+
+    def test_successful_cleanup_is_reported_as_completed(self):
+        job = self.db.add_cleanup_job('job2', 30, keep=app.MAX_TRACKED_CLEANUP_JOBS)
+        app._run_cleanup_job(job['job_id'], 30)
+
+        job = self.db.get_cleanup_job('job2')
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['deleted_records'], 0)
+        self.assertIsNone(job['error'])
+
+if __name__ == '__main__':
+    unittest.main()
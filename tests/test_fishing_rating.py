@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests pinning the fishing rating tables to the original if-ladder
+"""
+
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from update_weather_data import WeatherDataUpdater, rating_for_score
+
+def ladder_rating_for_score(total_score: float) -> str:
+    """Rating step of the original calculate_fishing_rating"""
+    if total_score >= 90:
+        return "Excellent Fishing"
+    elif total_score >= 80:
+        return "Great Fishing"
+    elif total_score >= 70:
+        return "Good Fishing"
+    elif total_score >= 60:
+        return "Fair Fishing"
+    elif total_score >= 50:
+        return "Moderate Fishing"
+    else:
+        return "Poor Fishing"
+
+def ladder_rating(wind_speed: float, temp: float, pressure: float) -> str:
+    """The original if-ladder calculate_fishing_rating"""
+    if wind_speed <= 4:
+        wind_score = 100
+    elif wind_speed <= 6:
+        wind_score = 80
+    elif wind_speed <= 8:
+        wind_score = 60
+    elif wind_speed <= 10:
+        wind_score = 40
+    else:
+        wind_score = 20
+
+    if 50 <= temp <= 75:
+        temp_score = 100
+    elif 40 <= temp <= 85:
+        temp_score = 80
+    else:
+        temp_score = 60
+
+    if pressure < 29.8:
+        pressure_score = 100
+    elif pressure <= 30.2:
+        pressure_score = 80
+    else:
+        pressure_score = 60
+
+    total_score = (wind_score * 0.6) + (temp_score * 0.15) + (pressure_score * 0.1)
+    return ladder_rating_for_score(total_score)
+
+def around(*edges: float, step: float = 0.01):
+    """Each edge plus the values just below and just above it"""
+    return [value for edge in edges for value in (edge - step, edge, edge + step)]
+
+# Every band edge, approached from both sides
+WIND_SPEEDS = [0] + around(4, 6, 8, 10) + [25]
+TEMPS = [0] + around(40, 50, 75, 85) + [100]
+PRESSURES = [28.5] + around(29.8, 30.2) + [31.0]
+SCORES = around(50, 60, 70, 80, 90) + [0, 45, 85, 100]
+
+class FishingRatingTest(unittest.TestCase):
+    def test_rating_matches_ladder_at_every_band_edge(self):
+        for wind_speed, temp, pressure in itertools.product(WIND_SPEEDS, TEMPS, PRESSURES):
+            with self.subTest(wind_speed=wind_speed, temp=temp, pressure=pressure):
+                self.assertEqual(
+                    WeatherDataUpdater.calculate_fishing_rating(None, wind_speed, temp, pressure),
+                    ladder_rating(wind_speed, temp, pressure))
+
+    def test_rating_for_score_matches_ladder_at_every_floor(self):
+        for score in SCORES:
+            with self.subTest(score=score):
+                self.assertEqual(rating_for_score(score), ladder_rating_for_score(score))
+
+    def test_band_edges_are_inclusive_as_before(self):
+        rate = lambda *args: WeatherDataUpdater.calculate_fishing_rating(None, *args)
+        # 4 mph is still the calmest band; 50 and 75 F are still ideal; 29.8 is not low
+        self.assertEqual(rate(4, 50, 29.79), "Great Fishing")
+        self.assertEqual(rate(4, 75, 29.79), "Great Fishing")
+        self.assertEqual(rate(4.01, 75, 29.79), "Good Fishing")
+        self.assertEqual(rate(8, 75, 29.79), "Fair Fishing")
+        self.assertEqual(rate(8, 75, 29.8), "Moderate Fishing")
+
+if __name__ == '__main__':
+    unittest.main()
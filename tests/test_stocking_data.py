@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for stocking_data.py
+"""
+
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stocking_data import NHStockingData, parse_stocking_date
+
+def baseline_parse(value: str):
+    """The original try-each-format parser"""
+    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+class ParseStockingDateTest(unittest.TestCase):
+    def test_supported_formats(self):
+        may_1 = datetime.date(2025, 5, 1)
+        cases = {
+            '2025-05-01': may_1,   # zero-padded ISO: fromisoformat fast path
+            '2025-5-1': may_1,     # unpadded ISO: strptime
+            '2025/05/01': may_1,
+            '2025/5/1': may_1,
+            '05/01/2025': may_1,
+            '5/1/2025': may_1,
+            '12/31/2024': datetime.date(2024, 12, 31),
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(parse_stocking_date(value), expected)
+                self.assertEqual(parse_stocking_date(value), baseline_parse(value))
+
+    def test_unparseable_input(self):
+        for value in ('', 'May 1, 2025', '2025.05.01', '01-05-2025', '2025-13-01',
+                      '2025-02-30', '13/01/2025', '2025/05/01 10:00', '20250501'):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_stocking_date(value))
+                self.assertIsNone(baseline_parse(value))
+
+class StockingMigrationTest(unittest.TestCase):
+    def test_duplicate_stockings_collapse_to_newest_copy(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, 'stocking.db')
+            # A pre-migration database: no unique index, each refresh stored again
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE stocking_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lake_name TEXT NOT NULL,
+                    species TEXT NOT NULL,
+                    stocking_date DATE NOT NULL,
+                    fish_size TEXT,
+                    quantity INTEGER,
+                    latitude REAL,
+                    longitude REAL,
+                    notes TEXT,
+                    source TEXT DEFAULT 'NH Fish & Game',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany("""
+                INSERT INTO stocking_records (lake_name, species, stocking_date, quantity)
+                VALUES (?, ?, ?, ?)
+            """, [
+                ('Squam', 'Rainbow Trout', '2025-05-01', 100),   # id 1
+                ('Squam', 'Rainbow Trout', '2025-05-01', 120),   # id 2, newest copy
+                ('Squam', 'Brook Trout', '2025-05-01', 50),      # id 3, other species
+                ('Squam', 'Rainbow Trout', '2025-05-08', 80),    # id 4, other date
+                ('Sunapee', 'Lake Trout', '2025-04-20', 200),    # id 5
+                ('Sunapee', 'Lake Trout', '2025-04-20', 210),    # id 6
+                ('Sunapee', 'Lake Trout', '2025-04-20', 220),    # id 7, newest copy
+            ])
+            conn.commit()
+            conn.close()
+
+            stocking = NHStockingData(db_path)
+            try:
+                rows = stocking.conn.execute(
+                    "SELECT id, lake_name, species, stocking_date, quantity FROM stocking_records "
+                    "ORDER BY id").fetchall()
+                indexes = {row[1] for row in stocking.conn.execute(
+                    "PRAGMA index_list(stocking_records)")}
+            finally:
+                stocking.close()
+
+        self.assertEqual(rows, [(2, 'Squam', 'Rainbow Trout', '2025-05-01', 120),
+                                (3, 'Squam', 'Brook Trout', '2025-05-01', 50),
+                                (4, 'Squam', 'Rainbow Trout', '2025-05-08', 80),
+                                (7, 'Sunapee', 'Lake Trout', '2025-04-20', 220)])
+        self.assertIn('idx_stocking_natural_key', indexes)
+
+class CloseTest(unittest.TestCase):
+    def test_methods_raise_after_close(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stocking = NHStockingData(os.path.join(tmpdir, 'stocking.db'))
+            stocking.close()
+            stocking.close()
+            with self.assertRaises(sqlite3.ProgrammingError):
+                stocking.get_stocking_data()
+            with self.assertRaises(sqlite3.ProgrammingError):
+                stocking.save_rows([])
+
+if __name__ == '__main__':
+    unittest.main()
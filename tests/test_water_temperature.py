@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for water_temperature.py: the NDBC realtime2 line parser and the
+latest-reading query
+"""
+
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from app import LATEST_WATER_TEMP_SQL
+from water_temperature import _NOAA_LINE_RE, WaterTemperatureData, WaterTemperatureRecord
+
+# Lines as they appear in an NDBC realtime2 .txt file (newest data first)
+HEADER = b"#YY  MM DD hh mm WDIR WSPD GST  WVHT   DPD   APD MWD   PRES  ATMP  WTMP  DEWP  VIS PTDY  TIDE"
+UNITS = b"#yr  mo dy hr mn degT m/s  m/s     m   sec   sec degT   hPa  degC  degC  degC  nmi  hPa    ft"
+DATA = b"2025 08 08 14 40 200  5.0  7.0   0.5     4   3.2 190 1015.2  24.1  21.3  17.0   MM   MM    MM"
+MISSING_WTMP = b"2025 08 08 14 50 200  5.0  7.0   0.5     4   3.2 190 1015.2  24.1    MM  17.0   MM   MM    MM"
+MISSING_OTHERS = b"2025 08 08 14 30  MM   MM   MM    MM    MM    MM  MM     MM    MM  -1.5    MM   MM   MM    MM"
+
+class NoaaLineTest(unittest.TestCase):
+    def test_data_line_captures_timestamp_and_wtmp(self):
+        match = _NOAA_LINE_RE.match(DATA)
+        self.assertIsNotNone(match)
+        self.assertEqual(tuple(map(int, match.groups()[:5])), (2025, 8, 8, 14, 40))
+        # WTMP, not the ATMP column just before it
+        self.assertEqual(float(match.group(6)), 21.3)
+
+    def test_missing_wtmp_does_not_match(self):
+        self.assertIsNone(_NOAA_LINE_RE.match(MISSING_WTMP))
+
+    def test_missing_other_columns_still_match(self):
+        match = _NOAA_LINE_RE.match(MISSING_OTHERS)
+        self.assertIsNotNone(match)
+        self.assertEqual(float(match.group(6)), -1.5)
+
+    def test_header_and_units_lines_do_not_match(self):
+        self.assertIsNone(_NOAA_LINE_RE.match(HEADER))
+        self.assertIsNone(_NOAA_LINE_RE.match(UNITS))
+
+    def test_scan_skips_newer_rows_without_wtmp(self):
+        # Newest rows come first; the 14:50 row has no water temperature
+        lines = [HEADER, UNITS, MISSING_WTMP, DATA]
+        match = next(m for m in map(_NOAA_LINE_RE.match, lines) if m)
+        self.assertEqual(int(match.group(5)), 40)
+
+class LatestTemperaturesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.water_temp = WaterTemperatureData(os.path.join(self.tmpdir.name, 'water.db'))
+
+    def tearDown(self):
+        self.water_temp.close()
+        self.tmpdir.cleanup()
+
+    def reading(self, celsius: float, timestamp: datetime.datetime, source: str):
+        return WaterTemperatureRecord('Champlain', celsius, celsius * 9 / 5 + 32, timestamp, source)
+
+    def test_latest_is_last_saved_reading_across_timestamp_formats(self):
+        usgs_tz = datetime.timezone(datetime.timedelta(hours=-4))
+        self.water_temp.save_temperature_records([
+            # Saved in time order; as text the NOAA string would sort last
+            self.reading(20.0, datetime.datetime(2025, 8, 8, 8, 0, tzinfo=usgs_tz), 'USGS'),
+            self.reading(21.0, datetime.datetime(2025, 8, 8, 13, 0), 'NOAA Buoy'),
+            self.reading(22.0, datetime.datetime(2025, 8, 8, 9, 30, 0, 123456), 'Estimated'),
+        ])
+        latest = self.water_temp.get_latest_temperatures()
+        self.assertEqual(list(latest), ['Champlain'])
+        self.assertEqual(latest['Champlain']['temperature_celsius'], 22.0)
+
+    def test_same_timestamp_from_two_sources_gives_one_row(self):
+        timestamp = datetime.datetime(2025, 8, 8, 13, 0)
+        self.water_temp.save_temperature_records([
+            self.reading(21.0, timestamp, 'NOAA Buoy'),
+            self.reading(21.5, timestamp, 'Estimated'),
+        ])
+        # The API's /api/water-temperature/latest query
+        rows = self.water_temp.conn.execute(LATEST_WATER_TEMP_SQL).fetchall()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(self.water_temp.get_latest_temperatures()['Champlain']['source'], 'Estimated')
+
+class ReadingMigrationTest(unittest.TestCase):
+    def test_duplicate_readings_collapse_to_newest_copy(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, 'water.db')
+            # A pre-migration database: no unique index, repeat fetches stored twice
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE water_temperature_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lake_name TEXT NOT NULL,
+                    temperature_celsius REAL NOT NULL,
+                    temperature_fahrenheit REAL NOT NULL,
+                    timestamp TIMESTAMP NOT NULL,
+                    source TEXT NOT NULL,
+                    latitude REAL,
+                    longitude REAL,
+                    depth REAL,
+                    notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany("""
+                INSERT INTO water_temperature_records
+                (lake_name, temperature_celsius, temperature_fahrenheit, timestamp, source)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                ('Champlain', 20.0, 68.0, '2025-08-08T13:00:00', 'NOAA Buoy'),   # id 1
+                ('Champlain', 20.5, 68.9, '2025-08-08T13:00:00', 'NOAA Buoy'),   # id 2, newest copy
+                ('Champlain', 21.0, 69.8, '2025-08-08T13:00:00', 'Estimated'),   # id 3, other source
+                ('Squam', 19.0, 66.2, '2025-08-08T12:00:00-04:00', 'USGS'),      # id 4
+                ('Squam', 19.5, 67.1, '2025-08-08T12:00:00-04:00', 'USGS'),      # id 5
+                ('Squam', 19.9, 67.8, '2025-08-08T12:00:00-04:00', 'USGS'),      # id 6, newest copy
+            ])
+            conn.commit()
+            conn.close()
+
+            with WaterTemperatureData(db_path) as water_temp:
+                rows = water_temp.conn.execute(
+                    "SELECT id, lake_name, temperature_celsius, source FROM water_temperature_records "
+                    "ORDER BY id").fetchall()
+                indexes = {row[1] for row in water_temp.conn.execute(
+                    "PRAGMA index_list(water_temperature_records)")}
+
+        self.assertEqual(rows, [(2, 'Champlain', 20.5, 'NOAA Buoy'),
+                                (3, 'Champlain', 21.0, 'Estimated'),
+                                (6, 'Squam', 19.9, 'USGS')])
+        self.assertIn('idx_wt_reading', indexes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Tests for WorkingWeatherDatabase: schema migration, upserts, the
+weather_stats triggers, date bounds, the read cache,
+bulk sessions and close
+"""
+
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import db_connection
+from working_database import WorkingWeatherDatabase
+
+def weather_row(location: str, date_ts: int) -> tuple:
+    """One row in WEATHER_UPSERT_SQL column order"""
+    return (location, date_ts, 'Friday 08-08-2025', '06:30', 'Clear sky',
+            65.0, 29.92, 8.5, 12.0, 'Good Fishing', 'Good Fishing')
+
+class WeatherMigrationTest(unittest.TestCase):
+    def test_duplicate_rows_collapse_to_newest_copy(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, 'weather.db')
+            # A pre-migration database: no unique index, no weather_stats
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE weather_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    location TEXT NOT NULL,
+                    date_ts INTEGER,
+                    date_str TEXT,
+                    sunrise TEXT,
+                    summary TEXT,
+                    temp_day REAL,
+                    pressure REAL,
+                    wind_speed REAL,
+                    wind_gust REAL,
+                    fishing_base TEXT,
+                    fishing_rating TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO weather_data (location, date_ts, summary) VALUES (?, ?, ?)", [
+                    ('Squam', 1000, 'first'),       # id 1
+                    ('Squam', 1000, 'second'),      # id 2, newest copy
+                    ('Squam', 2000, 'only'),        # id 3, other time
+                    ('Sunapee', 1000, 'only'),      # id 4, other location
+                    ('Sunapee', 3000, 'first'),     # id 5
+                    ('Sunapee', 3000, 'second'),    # id 6
+                    ('Sunapee', 3000, 'third'),     # id 7, newest copy
+                ])
+            conn.commit()
+            conn.close()
+
+            with WorkingWeatherDatabase(db_path) as db:
+                rows = db.conn.execute(
+                    "SELECT id, location, date_ts, summary FROM weather_data ORDER BY id").fetchall()
+                indexes = {row[1] for row in db.conn.execute("PRAGMA index_list(weather_data)")}
+                counts = db.get_statistics()['location_counts']
+
+        self.assertEqual(rows, [(2, 'Squam', 1000, 'second'),
+                                (3, 'Squam', 2000, 'only'),
+                                (4, 'Sunapee', 1000, 'only'),
+                                (7, 'Sunapee', 3000, 'third')])
+        self.assertIn('idx_weather_loc_ts', indexes)
+        # weather_stats is backfilled from the deduplicated rows
+        self.assertEqual(counts, {'Squam': 2, 'Sunapee': 2})
+
+class WeatherUpsertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def stats(self):
+        return dict(self.db.conn.execute("SELECT location, cnt FROM weather_stats WHERE cnt > 0"))
+
+    def test_upsert_keeps_id_and_created_at(self):
+        self.db.store_weather_rows([weather_row('Squam', 1000)])
+        # Backdate created_at so an overwrite would be visible
+        with self.db._lock, self.db.conn:
+            self.db.conn.execute("UPDATE weather_data SET created_at = '2020-01-01 00:00:00'")
+        (row_id,), = self.db.conn.execute("SELECT id FROM weather_data").fetchall()
+
+        updated = weather_row('Squam', 1000)[:4] + ('Rain',) + weather_row('Squam', 1000)[5:]
+        self.db.store_weather_rows([updated])
+
+        self.assertEqual(self.db.conn.execute(
+            "SELECT id, created_at, summary FROM weather_data").fetchall(),
+            [(row_id, '2020-01-01 00:00:00', 'Rain')])
+
+    def test_multi_row_upsert_updates_in_place(self):
+        # More rows than one multi-row VALUES chunk, stored twice
+        rows = [weather_row('Squam', ts) for ts in range(1000, 1130)]
+        self.db.store_weather_rows(rows)
+        ids = self.db.conn.execute("SELECT id FROM weather_data ORDER BY id").fetchall()
+        self.db.store_weather_rows(rows)
+        self.assertEqual(self.db.conn.execute("SELECT id FROM weather_data ORDER BY id").fetchall(), ids)
+
+    def test_weather_stats_follow_insert_upsert_delete_and_move(self):
+        self.db.store_weather_rows([weather_row('Squam', 1000), weather_row('Squam', 2000),
+                                    weather_row('Sunapee', 1000)])
+        self.assertEqual(self.stats(), {'Squam': 2, 'Sunapee': 1})
+
+        # An upsert of an existing row is an update, not a second row
+        self.db.store_weather_rows([weather_row('Squam', 1000), weather_row('Sunapee', 2000)])
+        self.assertEqual(self.stats(), {'Squam': 2, 'Sunapee': 2})
+
+        with self.db._lock, self.db.conn:
+            self.db.conn.execute("DELETE FROM weather_data WHERE location = 'Squam' AND date_ts = 1000")
+            # Moving a row between locations shifts one count across
+            self.db.conn.execute("UPDATE weather_data SET location = 'Squam', date_ts = 1000 "
+                                 "WHERE location = 'Sunapee' AND date_ts = 2000")
+        self.assertEqual(self.stats(), {'Squam': 2, 'Sunapee': 1})
+
+        # The counts always agree with the table itself
+        self.assertEqual(self.stats(), dict(self.db.conn.execute(
+            "SELECT location, COUNT(*) FROM weather_data GROUP BY location")))
+
+class WeatherDateBoundsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+        self.start = datetime.datetime(2025, 8, 8)
+        self.db.store_weather_rows([weather_row('Squam', int(self.start.timestamp()) + hour * 3600)
+                                    for hour in (-1, 0, 1)])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_datetime_date_and_epoch_bounds_agree(self):
+        for start_date in (self.start, self.start.date(), int(self.start.timestamp())):
+            with self.subTest(start_date=start_date):
+                rows = self.db.get_weather_data(start_date=start_date)
+                self.assertEqual(len(rows), 2)
+
+    def test_unsupported_bound_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            self.db.get_weather_data(start_date='2025-08-08')
+        with self.assertRaises(TypeError):
+            list(self.db.iter_weather_data(end_date=True))
+
+class ReadCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_fetch_runs_without_holding_the_lock(self):
+        def try_lock(acquired: list):
+            if self.db._lock.acquire(timeout=1):
+                self.db._lock.release()
+                acquired.append(True)
+
+        def fetch():
+            # Another thread can still take the lock, e.g. to write
+            acquired = []
+            thread = threading.Thread(target=try_lock, args=(acquired,))
+            thread.start()
+            thread.join()
+            return bool(acquired)
+
+        self.assertTrue(self.db._cached(('probe',), 60, fetch))
+
+    def test_result_fetched_across_a_write_is_not_cached(self):
+        def stale_fetch():
+            counts = self.db._read_statistics()
+            # A write lands after the read but before the result is stored
+            self.db.store_weather_rows([weather_row('Squam', 1000)])
+            return counts
+
+        self.assertEqual(self.db._cached(('statistics',), 60, stale_fetch)['total_records'], 0)
+        self.assertEqual(self.db.get_statistics()['total_records'], 1)
+
+    def test_result_is_reused_until_a_write(self):
+        fetches = []
+        fetch = lambda: fetches.append(1) or len(fetches)
+        self.assertEqual(self.db._cached(('probe',), 60, fetch), 1)
+        self.assertEqual(self.db._cached(('probe',), 60, fetch), 1)
+        self.db.store_weather_rows([weather_row('Squam', 1000)])
+        self.assertEqual(self.db._cached(('probe',), 60, fetch), 2)
+
+class BulkSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+        self.now = int(time.time())
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_reads_and_cleanup_inside_failed_session_persist_nothing(self):
+        old_ts = self.now - 90 * 86400
+        self.db.store_weather_rows([weather_row('Squam', old_ts)])
+
+        with self.assertRaises(RuntimeError):
+            with self.db.bulk_session():
+                self.db.store_weather_rows(weather_row('Sunapee', self.now - i * 3600)
+                                           for i in range(60))
+                self.db.get_statistics()
+                self.db.get_fishing_conditions()
+                self.db.get_cleanup_statistics()
+                self.assertEqual(self.db.cleanup_old_data(days_to_keep=30), 1)
+                raise RuntimeError('abort session')
+
+        rows = self.db.conn.execute(
+            "SELECT location, date_ts FROM weather_data").fetchall()
+        self.assertEqual(rows, [('Squam', old_ts)])
+        self.assertEqual(self.db.get_statistics()['location_counts'], {'Squam': 1})
+
+class FailingOptimizeConnection:
+    """Stands in for a connection whose PRAGMA optimize fails"""
+    closed = False
+
+    def execute(self, sql):
+        raise sqlite3.OperationalError('database is locked')
+
+    def close(self):
+        self.closed = True
+
+class CloseTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_close_is_idempotent(self):
+        self.db.close()
+        self.db.close()
+
+    def test_public_methods_raise_after_close(self):
+        self.db.close()
+        calls = {
+            'store_weather_rows': lambda: self.db.store_weather_rows([weather_row('Squam', 1000)]),
+            'get_weather_data': self.db.get_weather_data,
+            'iter_weather_data': lambda: next(self.db.iter_weather_data()),
+            'get_statistics': self.db.get_statistics,
+            'get_fishing_conditions': self.db.get_fishing_conditions,
+            'cleanup_old_data': self.db.cleanup_old_data,
+            'get_cleanup_statistics': self.db.get_cleanup_statistics,
+            'add_cleanup_job': lambda: self.db.add_cleanup_job('job', 30, 10),
+            'update_cleanup_job': lambda: self.db.update_cleanup_job('job', 'running'),
+            'get_cleanup_job': lambda: self.db.get_cleanup_job('job'),
+            'bulk_session': lambda: self.db.bulk_session().__enter__(),
+        }
+        for name, call in calls.items():
+            with self.subTest(name), self.assertRaises(sqlite3.ProgrammingError):
+                call()
+
+    def test_connection_closes_when_optimize_fails(self):
+        conn = FailingOptimizeConnection()
+        with self.assertRaises(sqlite3.OperationalError):
+            db_connection.close(conn)
+        self.assertTrue(conn.closed)
+
+class StoreFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = WorkingWeatherDatabase(os.path.join(self.tmpdir.name, 'weather.db'))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_failed_store_reports_false_when_a_session_opens_meanwhile(self):
+        session_open = threading.Event()
+        release = threading.Event()
+
+        def hold_session():
+            with self.db.bulk_session():
+                session_open.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold_session)
+
+        @contextmanager
+        def open_session_on_exit(name):
+            # Runs after store_weather_rows has released the lock, before its except
+            try:
+                yield
+            finally:
+                thread.start()
+                session_open.wait(5)
+
+        try:
+            with mock.patch('working_database.progress_point', open_session_on_exit):
+                # NULL location: the upsert fails outside any session of this thread
+                self.assertFalse(self.db.store_weather_rows([weather_row(None, 1000)]))
+        finally:
+            release.set()
+            thread.join()
+
+if __name__ == '__main__':
+    unittest.main()
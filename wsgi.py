@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for production servers, e.g.
+gunicorn -w 4 -k gthread --threads 8 -b 127.0.0.1:5000 wsgi:app
+"""
+
+from app import app
+
+if __name__ == '__main__':
+    app.run()